@@ -0,0 +1,213 @@
+import json
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+)
+
+from benchmarks.models import (
+    GapFillingEntry,
+    ResolvingEntry,
+)
+from django.core.management.base import (
+    BaseCommand,
+    CommandParser,
+)
+from django.db import (
+    DatabaseError,
+    connection,
+    connections,
+    transaction,
+)
+
+from django_seq.utils import get_sequence_model
+
+
+MODES = (
+    'plain',
+    'nowait',
+    'fill_gaps',
+    'resolve_integrity_errors',
+)
+
+KEY_LAYOUTS = (
+    'single',
+    'many',
+)
+
+WORKER_TYPES = (
+    'thread',
+    'process',
+)
+
+
+def allocate(
+    mode: str,
+    bucket: int,
+) -> None:
+    with transaction.atomic():
+        if mode == 'fill_gaps':
+            GapFillingEntry.objects.create(bucket=bucket)
+        elif mode == 'resolve_integrity_errors':
+            ResolvingEntry.objects.create(bucket=bucket)
+        else:
+            get_sequence_model().get_next_value(
+                f'benchmarks.{bucket}.entries',
+                nowait=mode == 'nowait',
+            )
+
+
+def run_worker(
+    mode: str,
+    bucket: int,
+    allocations: int,
+) -> Tuple[List[float], Dict[str, int]]:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    try:
+        for _ in range(allocations):
+            started_at = time.perf_counter()
+            try:
+                allocate(mode, bucket)
+            except DatabaseError as error:
+                name = type(error).__name__
+                errors[name] = errors.get(name, 0) + 1
+                continue
+            latencies.append(time.perf_counter() - started_at)
+    finally:
+        connection.close()
+    return latencies, errors
+
+
+class Command(BaseCommand):
+
+    help = 'Measures the throughput and latency of sequence allocation under contention.'
+
+    def add_arguments(
+        self,
+        parser: CommandParser,
+    ) -> None:
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--allocations', type=int, default=100)
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+        parser.add_argument('--keys', nargs='+', choices=KEY_LAYOUTS, default=KEY_LAYOUTS)
+        parser.add_argument('--worker-types', nargs='+', choices=WORKER_TYPES, default=WORKER_TYPES)
+        parser.add_argument('--output', type=str, default=None)
+
+    def handle(
+        self,
+        *args: Any,
+        **options: Any,
+    ) -> None:
+        results: List[Dict[str, Any]] = []
+
+        for mode in options['modes']:
+            for key_layout in options['keys']:
+                for worker_type in options['worker_types']:
+                    self.reset()
+                    result = self.run(
+                        mode,
+                        key_layout,
+                        worker_type,
+                        options['workers'],
+                        options['allocations'],
+                    )
+                    results.append(result)
+                    self.stderr.write(
+                        f'{mode} / {key_layout} / {worker_type}: '
+                        f'{result["allocations_per_second"]:.1f} allocations/s',
+                    )
+
+        self.reset()
+
+        report = json.dumps(
+            {
+                'vendor': connection.vendor,
+                'workers': options['workers'],
+                'allocations': options['allocations'],
+                'results': results,
+            },
+            indent=2,
+        )
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(report)
+        else:
+            self.stdout.write(report)
+
+    def run(
+        self,
+        mode: str,
+        key_layout: str,
+        worker_type: str,
+        workers: int,
+        allocations: int,
+    ) -> Dict[str, Any]:
+        arguments = [
+            (mode, 0 if key_layout == 'single' else worker_idx, allocations)
+            for worker_idx in range(workers)
+        ]
+
+        outcomes: List[Tuple[List[float], Dict[str, int]]]
+
+        if worker_type == 'process':
+            # Connections must not be shared with the forked processes.
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                started_at = time.perf_counter()
+                outcomes = pool.starmap(run_worker, arguments)
+                duration = time.perf_counter() - started_at
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                started_at = time.perf_counter()
+                outcomes = list(executor.map(run_worker, *zip(*arguments)))
+                duration = time.perf_counter() - started_at
+
+        latencies = sorted(
+            latency
+            for worker_latencies, _ in outcomes
+            for latency in worker_latencies
+        )
+        errors: Dict[str, int] = {}
+        for _, worker_errors in outcomes:
+            for name, count in worker_errors.items():
+                errors[name] = errors.get(name, 0) + count
+
+        return {
+            'mode': mode,
+            'keys': key_layout,
+            'worker_type': worker_type,
+            'allocations': len(latencies),
+            'errors': errors,
+            'duration': duration,
+            'allocations_per_second': len(latencies) / duration,
+            'latency': self.get_percentiles(latencies),
+        }
+
+    def get_percentiles(
+        self,
+        latencies: List[float],
+    ) -> Dict[str, float]:
+        if len(latencies) < 2:
+            latencies = latencies * 2 or [0.0, 0.0]
+        quantiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        return {
+            'p50': quantiles[49],
+            'p99': quantiles[98],
+        }
+
+    def reset(self) -> None:
+        Sequence = get_sequence_model()
+        Sequence.objects.filter(
+            **{
+                f'{Sequence.KEY_FIELD_NAME}__startswith': 'benchmarks.',
+            },
+        ).delete()
+        GapFillingEntry.objects.all().delete()
+        ResolvingEntry.objects.all().delete()
@@ -0,0 +1,105 @@
+import json
+import statistics
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+
+from benchmarks.models import Number
+from django.core.management.base import (
+    BaseCommand,
+    CommandParser,
+)
+from django.db import (
+    connection,
+    transaction,
+)
+from django.db.models import QuerySet
+
+from django_seq.gaps import GapFinder
+
+
+class Command(BaseCommand):
+
+    help = 'Compares the gap finding strategies on a table with many rows.'
+
+    def add_arguments(
+        self,
+        parser: CommandParser,
+    ) -> None:
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--gap', type=int, default=None)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--output', type=str, default=None)
+
+    def handle(
+        self,
+        *args: Any,
+        **options: Any,
+    ) -> None:
+        rows: int = options['rows']
+        gap: int = options['gap'] or rows - rows // 100
+
+        self.populate(rows, gap, options['batch_size'])
+
+        strategies: Dict[str, Callable[[QuerySet, str], Optional[int]]] = {
+            'window': GapFinder.find_with_window,
+            'subquery': GapFinder.find_with_subquery,
+        }
+
+        results: Dict[str, Dict[str, float]] = {}
+
+        for name, find in strategies.items():
+            durations: List[float] = []
+            for _ in range(options['repeat']):
+                started_at = time.perf_counter()
+                first_gap = find(Number.objects.all(), 'value')
+                durations.append(time.perf_counter() - started_at)
+                assert first_gap == gap - 1, (name, first_gap)  # noqa
+            results[name] = {
+                'min': min(durations),
+                'median': statistics.median(durations),
+                'max': max(durations),
+            }
+
+        report = json.dumps(
+            {
+                'vendor': connection.vendor,
+                'rows': rows,
+                'gap': gap,
+                'results': results,
+            },
+            indent=2,
+        )
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(report)
+        else:
+            self.stdout.write(report)
+
+    def populate(
+        self,
+        rows: int,
+        gap: int,
+        batch_size: int,
+    ) -> None:
+        with transaction.atomic():
+            Number.objects.all().delete()
+            values = (value for value in range(1, rows + 2) if value != gap)
+            batch: List[Number] = []
+            for value in values:
+                batch.append(Number(value=value))
+                if len(batch) >= batch_size:
+                    Number.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                Number.objects.bulk_create(batch)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(Number._meta.db_table)}')
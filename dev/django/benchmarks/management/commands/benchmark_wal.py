@@ -0,0 +1,124 @@
+import json
+from typing import (
+    Any,
+    Dict,
+    Tuple,
+)
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import (
+    connection,
+    transaction,
+)
+
+from django_seq.utils import get_sequence_model
+
+
+MODES = (
+    'upsert',
+    'select_for_update',
+)
+
+
+class Command(BaseCommand):
+
+    help = 'Measures the WAL volume written per sequence allocation on PostgreSQL.'
+
+    def add_arguments(
+        self,
+        parser: CommandParser,
+    ) -> None:
+        parser.add_argument('--allocations', type=int, default=10_000)
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+        parser.add_argument('--output', type=str, default=None)
+
+    def handle(
+        self,
+        *args: Any,
+        **options: Any,
+    ) -> None:
+        if connection.vendor != 'postgresql':
+            raise CommandError('WAL volume can only be measured on PostgreSQL.')
+
+        allocations: int = options['allocations']
+
+        results: Dict[str, Dict[str, float]] = {}
+
+        for mode in options['modes']:
+            key = f'benchmarks.wal.{mode}'
+            # The first allocation creates the row, which isn't measured.
+            self.allocate(key, mode)
+
+            started_at_lsn, started_at_updates = self.get_position()
+            for _ in range(allocations):
+                self.allocate(key, mode)
+            finished_at_lsn, finished_at_updates = self.get_position()
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_wal_lsn_diff(%s, %s)',
+                    [finished_at_lsn, started_at_lsn],
+                )
+                wal_bytes = int(cursor.fetchone()[0])
+
+            updates = finished_at_updates[0] - started_at_updates[0]
+            hot_updates = finished_at_updates[1] - started_at_updates[1]
+
+            results[mode] = {
+                'wal_bytes': wal_bytes,
+                'wal_bytes_per_allocation': wal_bytes / allocations,
+                'hot_update_ratio': hot_updates / updates if updates else 0.0,
+            }
+
+        Sequence = get_sequence_model()
+        Sequence.objects.filter(
+            **{
+                f'{Sequence.KEY_FIELD_NAME}__startswith': 'benchmarks.wal.',
+            },
+        ).delete()
+
+        report = json.dumps(
+            {
+                'vendor': connection.vendor,
+                'allocations': allocations,
+                'results': results,
+            },
+            indent=2,
+        )
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(report)
+        else:
+            self.stdout.write(report)
+
+    def allocate(
+        self,
+        key: str,
+        mode: str,
+    ) -> None:
+        with transaction.atomic():
+            get_sequence_model().get_next_value(
+                key,
+                nowait=mode == 'select_for_update',
+            )
+
+    def get_position(self) -> Tuple[str, Tuple[int, int]]:
+        Sequence = get_sequence_model()
+        with connection.cursor() as cursor:
+            # Statistics are flushed at the end of the next transaction, and
+            # they are cached in the transaction that reads them.
+            cursor.execute('SELECT pg_stat_force_next_flush()')
+            cursor.execute('SELECT pg_stat_clear_snapshot()')
+            cursor.execute(
+                'SELECT n_tup_upd, n_tup_hot_upd FROM pg_stat_user_tables WHERE relid = %s::regclass',
+                [connection.ops.quote_name(Sequence._meta.db_table)],
+            )
+            updates = cursor.fetchone()
+            cursor.execute('SELECT pg_current_wal_lsn()')
+            lsn = cursor.fetchone()[0]
+        return lsn, (int(updates[0]), int(updates[1]))
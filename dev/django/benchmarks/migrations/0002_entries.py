@@ -0,0 +1,34 @@
+import django_seq.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('benchmarks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GapFillingEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveIntegerField()),
+                ('number', django_seq.models.SequenceField(backend=None, blank=True, block_size=None, editable=False, fill_gaps=True, key=['benchmarks', models.F('bucket'), 'gap_filling_entries'], nowait=False, recycle_values=False, resolve_integrity_errors=False, separator='.')),
+            ],
+            options={
+                'unique_together': {('bucket', 'number')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ResolvingEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveIntegerField()),
+                ('number', django_seq.models.SequenceField(backend=None, blank=True, block_size=None, editable=False, fill_gaps=False, key=['benchmarks', models.F('bucket'), 'resolving_entries'], nowait=False, recycle_values=False, resolve_integrity_errors=True, separator='.')),
+            ],
+            options={
+                'unique_together': {('bucket', 'number')},
+            },
+        ),
+    ]
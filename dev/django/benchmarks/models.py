@@ -0,0 +1,40 @@
+from django.db import models
+
+from django_seq.models import SequenceField
+
+
+class Number(models.Model):
+
+    value = models.PositiveBigIntegerField(  # type: ignore
+        unique=True,
+    )
+
+
+class GapFillingEntry(models.Model):
+
+    bucket = models.PositiveIntegerField()  # type: ignore
+
+    number = SequenceField(  # type: ignore
+        key=['benchmarks', models.F('bucket'), 'gap_filling_entries'],
+        fill_gaps=True,
+    )
+
+    class Meta:
+        unique_together = (
+            ('bucket', 'number'),
+        )
+
+
+class ResolvingEntry(models.Model):
+
+    bucket = models.PositiveIntegerField()  # type: ignore
+
+    number = SequenceField(  # type: ignore
+        key=['benchmarks', models.F('bucket'), 'resolving_entries'],
+        resolve_integrity_errors=True,
+    )
+
+    class Meta:
+        unique_together = (
+            ('bucket', 'number'),
+        )
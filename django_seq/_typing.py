@@ -8,9 +8,13 @@ from django_seq._typing_ext import mimic_generic_type
 
 __all__ = (
     'IS_MYPY_DJANGO_PLUGIN_ENABLED',
+    'BigIntegerField',
+    'BooleanField',
+    'CharField',
     'DateTimeField',
     'PositiveBigIntegerField',
     'TextField',
+    'UUIDField',
 )
 
 
@@ -26,6 +30,21 @@ with suppress(
         IS_MYPY_DJANGO_PLUGIN_ENABLED = True
 
 
+BigIntegerField = models.BigIntegerField
+if not IS_MYPY_DJANGO_PLUGIN_ENABLED:
+    BigIntegerField = mimic_generic_type(models.BigIntegerField)  # type: ignore[misc]
+
+
+BooleanField = models.BooleanField
+if not IS_MYPY_DJANGO_PLUGIN_ENABLED:
+    BooleanField = mimic_generic_type(models.BooleanField)  # type: ignore[misc]
+
+
+CharField = models.CharField
+if not IS_MYPY_DJANGO_PLUGIN_ENABLED:
+    CharField = mimic_generic_type(models.CharField)  # type: ignore[misc]
+
+
 DateTimeField = models.DateTimeField
 if not IS_MYPY_DJANGO_PLUGIN_ENABLED:
     DateTimeField = mimic_generic_type(models.DateTimeField)  # type: ignore[misc]
@@ -39,3 +58,8 @@ if not IS_MYPY_DJANGO_PLUGIN_ENABLED:
 TextField = models.TextField
 if not IS_MYPY_DJANGO_PLUGIN_ENABLED:
     TextField = mimic_generic_type(models.TextField)  # type: ignore[misc]
+
+
+UUIDField = models.UUIDField
+if not IS_MYPY_DJANGO_PLUGIN_ENABLED:
+    UUIDField = mimic_generic_type(models.UUIDField)  # type: ignore[misc]
@@ -7,6 +7,7 @@ from django import forms
 from django.contrib import admin
 from django.contrib.admin import widgets
 from django.db import models
+from django.db.models import QuerySet
 from django.http import HttpRequest
 
 from django_seq.models import Sequence
@@ -53,6 +54,37 @@ class SequenceAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(
+        self,
+        request: HttpRequest,
+    ) -> QuerySet:
+        return super(SequenceAdmin, self).get_queryset(request).using(
+            Sequence.get_database_alias(),
+        )
+
+    def save_model(
+        self,
+        request: HttpRequest,
+        obj: Any,
+        form: Any,
+        change: bool,
+    ) -> None:
+        obj.save(using=Sequence.get_database_alias())
+
+    def delete_model(
+        self,
+        request: HttpRequest,
+        obj: Any,
+    ) -> None:
+        obj.delete(using=Sequence.get_database_alias())
+
+    def delete_queryset(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet,
+    ) -> None:
+        queryset.using(Sequence.get_database_alias()).delete()
+
     def formfield_for_dbfield(  # type: ignore[override]
         self,
         db_field: models.Field,
@@ -0,0 +1,325 @@
+import collections
+import functools
+import logging
+import os
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+from django.db import (
+    DatabaseError,
+    router,
+    transaction,
+)
+from django.db.models import Model
+
+from django_seq.backends import Backend
+from django_seq.conf import settings
+from django_seq.instrumentation import measure
+from django_seq.retry import RetryPolicy
+from django_seq.utils import get_sequence_model
+
+if TYPE_CHECKING:
+    from django_seq.fields import SequenceField
+
+
+__all__ = (
+    'BlockAllocator',
+    'ModelAllocator',
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+BlockKey = Tuple[Backend, str]
+
+Lease = Tuple[Sequence[int], float]
+
+
+class BlockAllocator:
+
+    lock: threading.Lock
+
+    blocks: 'collections.OrderedDict[BlockKey, List[Lease]]'
+
+    pid: int
+
+    ttl: Optional[float]
+
+    max_keys: Optional[int]
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_keys: Optional[int] = None,
+    ) -> None:
+        self.lock = threading.Lock()
+        self.blocks = collections.OrderedDict()
+        self.pid = os.getpid()
+        self.ttl = ttl
+        self.max_keys = max_keys
+
+    def get_ttl(self) -> Optional[float]:
+        if self.ttl is not None:
+            return self.ttl
+        return settings.BLOCK_TTL
+
+    def get_max_keys(self) -> Optional[int]:
+        if self.max_keys is not None:
+            return self.max_keys
+        return settings.BLOCK_MAX_KEYS
+
+    def get_block_key(
+        self,
+        backend: Backend,
+        key: str,
+    ) -> BlockKey:
+        return backend, key
+
+    def get_next_value(
+        self,
+        backend: Backend,
+        key: str,
+        block_size: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        if block_size <= 1:
+            return backend.get_next_value(
+                key,
+                nowait=nowait,
+                retry_policy=retry_policy,
+            )
+
+        block_key = self.get_block_key(backend, key)
+
+        value = self.pop(block_key)
+        if value is not None:
+            return value
+
+        block = backend.get_next_values(
+            key,
+            block_size,
+            nowait=nowait,
+            retry_policy=retry_policy,
+        )
+
+        transaction.on_commit(
+            functools.partial(
+                self.push,
+                block_key,
+                block[1:],
+            ),
+            using=backend.get_database_alias(),
+        )
+
+        return block[0]
+
+    def pop(
+        self,
+        block_key: BlockKey,
+    ) -> Optional[int]:
+        now = time.monotonic()
+        with self.lock:
+            self.ensure_process()
+            leases = self.blocks.get(block_key)
+            # Expired leases are discarded, which bounds how long a process
+            # hands out values that are behind the other processes.
+            while leases and leases[0][1] <= now:
+                leases.pop(0)
+            if not leases:
+                self.blocks.pop(block_key, None)
+                return None
+            self.blocks.move_to_end(block_key)
+            block, expires_at = leases[0]
+            if len(block) > 1:
+                leases[0] = (block[1:], expires_at)
+            else:
+                leases.pop(0)
+            return block[0]
+
+    def push(
+        self,
+        block_key: BlockKey,
+        block: Sequence[int],
+    ) -> None:
+        if not block:
+            return
+        ttl = self.get_ttl()
+        max_keys = self.get_max_keys()
+        expires_at = time.monotonic() + ttl if ttl is not None else float('inf')
+        with self.lock:
+            self.ensure_process()
+            self.blocks.setdefault(block_key, []).append((block, expires_at))
+            self.blocks.move_to_end(block_key)
+            while max_keys is not None and len(self.blocks) > max_keys:
+                self.blocks.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.blocks.clear()
+
+    def close(self) -> int:
+        with self.lock:
+            self.ensure_process()
+            blocks = list(self.blocks.items())
+            self.blocks.clear()
+
+        returned = 0
+        for (backend, key), leases in blocks:
+            # The latest block is returned first, so the earlier ones can be
+            # returned after it as well.
+            for block, _ in reversed(leases):
+                try:
+                    returned += backend.return_values(key, block)
+                except DatabaseError:
+                    logger.debug(
+                        'Unable to return the values of "%s" sequence.',
+                        key,
+                        exc_info=True,
+                    )
+                    break
+        return returned
+
+    def ensure_process(self) -> None:
+        # Blocks that are inherited from a parent process are shared with it,
+        # so they are discarded to prevent handing out the same values twice.
+        pid = os.getpid()
+        if self.pid != pid:
+            self.blocks.clear()
+            self.pid = pid
+
+
+class ModelAllocator:
+
+    fields: List['SequenceField']
+
+    def __init__(
+        self,
+        fields: List['SequenceField'],
+    ) -> None:
+        self.fields = sorted(fields, key=lambda field: field.creation_counter)
+
+    def can_allocate_together(
+        self,
+        instance: Model,
+        key_fields: List['SequenceField'],
+    ) -> bool:
+        # A sequence which is set to a target value can't be incremented by
+        # the same statement, nor set to another value.
+        if not all(field.can_allocate_in_bulk() for field in key_fields):
+            return False
+        target_fields = [
+            field
+            for field in key_fields
+            if field.get_target_mode(instance) is not None
+        ]
+        return not target_fields or len(key_fields) == 1
+
+    def handle_pre_save_signal(
+        self,
+        sender: Type[Model],
+        instance: Model,
+        **kwargs: Any,
+    ) -> int:
+        started_at = time.perf_counter()
+
+        key_fields: Dict[str, List['SequenceField']] = {}
+        for field in self.fields:
+            if not field.should_generate(instance):
+                continue
+            evaluated_key = field.evaluate_key(sender, instance)
+            if evaluated_key:
+                key_fields.setdefault(evaluated_key, []).append(field)
+
+        key_evaluation_duration = time.perf_counter() - started_at
+
+        # The sequences are locked in the order of the keys, so the concurrent
+        # saves lock them in the same order. The consecutive keys which can
+        # be allocated together are allocated by a single statement.
+        batches: List[Tuple[bool, List[Tuple['SequenceField', str]]]] = []
+        for evaluated_key in sorted(key_fields):
+            pairs = [(field, evaluated_key) for field in key_fields[evaluated_key]]
+            if not self.can_allocate_together(instance, key_fields[evaluated_key]):
+                batches.extend((False, [pair]) for pair in pairs)
+            elif batches and batches[-1][0]:
+                batches[-1][1].extend(pairs)
+            else:
+                batches.append((True, pairs))
+
+        for is_bulk, pairs in batches:
+            if is_bulk and len(pairs) > 1:
+                self.allocate_in_bulk(sender, instance, pairs, key_evaluation_duration)
+            else:
+                for field, evaluated_key in pairs:
+                    field.allocate(sender, instance, evaluated_key, key_evaluation_duration)
+
+        return sum(map(len, key_fields.values()))
+
+    def allocate_in_bulk(
+        self,
+        sender: Type[Model],
+        instance: Model,
+        evaluated_keys: List[Tuple['SequenceField', str]],
+        key_evaluation_duration: float = 0.0,
+    ) -> None:
+        from django_seq.models import ReleasedValue
+
+        sequence_model = get_sequence_model()
+
+        def get_aliases() -> List[str]:
+            return [
+                sequence_model.get_database_alias(),
+                router.db_for_write(sender, instance=instance),
+            ]
+
+        counts: Dict[str, int] = collections.Counter()
+        current_values: Dict[str, int] = {}
+        values: Dict['SequenceField', int] = {}
+
+        with measure(sender, 'pre_save', ', '.join(sorted({key for _, key in evaluated_keys})), get_aliases) as event:
+            event.key_evaluation_duration = key_evaluation_duration
+            event.mode = 'bulk'
+            # The target values are computed before any sequence is locked.
+            for field, evaluated_key in evaluated_keys:
+                mode = field.get_target_mode(instance)
+                if mode is not None:
+                    values[field] = current_values[evaluated_key] = field.get_target_value(
+                        sender,
+                        instance,
+                        evaluated_key,
+                        sequence_model,
+                        mode,
+                    )
+                    continue
+                if field.should_recycle_values(instance):
+                    with event.measure_lock():
+                        released_value = ReleasedValue.claim(evaluated_key)
+                    if released_value is not None:
+                        values[field] = released_value
+                        continue
+                counts[evaluated_key] += 1
+
+            with event.measure_lock():
+                key_values = {
+                    evaluated_key: iter(key_range)
+                    for evaluated_key, key_range in sequence_model.get_next_values_for_keys(
+                        dict(counts),
+                        current_values=current_values,
+                    ).items()
+                }
+
+        for field, evaluated_key in evaluated_keys:
+            if field not in values:
+                values[field] = next(key_values[evaluated_key])
+            setattr(instance, field.name, values[field])
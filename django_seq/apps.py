@@ -1,3 +1,5 @@
+import atexit
+
 from django.apps import AppConfig
 from django.core.signals import setting_changed
 from django.utils.translation import gettext_lazy as _
@@ -18,8 +20,11 @@ class DjangoSeqConfig(AppConfig):
 
     def ready(self) -> None:
         from django_seq import setup
+        from django_seq.globals import block_allocator
         setup()
 
+        atexit.register(block_allocator.close)
+
         setting_changed.connect(
             setup,
             dispatch_uid='django_seq.setup',
@@ -0,0 +1,22 @@
+from django_seq.backends.base import (
+    Backend,
+    SequenceBackend,
+)
+from django_seq.backends.autonomous import AutonomousSequenceBackend
+from django_seq.backends.cache import CacheSequenceBackend
+from django_seq.backends.native import NativeSequenceBackend
+from django_seq.backends.pooled import PooledSequenceBackend
+from django_seq.backends.shared import SharedMemorySequenceBackend
+from django_seq.backends.striped import StripedSequenceBackend
+
+
+__all__ = (
+    'Backend',
+    'SequenceBackend',
+    'AutonomousSequenceBackend',
+    'CacheSequenceBackend',
+    'NativeSequenceBackend',
+    'PooledSequenceBackend',
+    'SharedMemorySequenceBackend',
+    'StripedSequenceBackend',
+)
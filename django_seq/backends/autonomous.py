@@ -0,0 +1,93 @@
+from typing import (
+    Any,
+    ContextManager,
+    Optional,
+    Sequence,
+)
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from django_seq.backends.base import SequenceBackend
+from django_seq.conf import settings
+from django_seq.retry import RetryPolicy
+from django_seq.utils import get_sequence_model
+
+
+__all__ = (
+    'AutonomousSequenceBackend',
+)
+
+
+class AutonomousSequenceBackend(SequenceBackend):
+
+    def get_database_alias(self) -> str:
+        using = self.using or settings.AUTONOMOUS_DATABASE
+        if not using:
+            raise ImproperlyConfigured(
+                f'AutonomousSequenceBackend requires a database alias, either by '
+                f'`using` parameter or by {settings.AUTONOMOUS_DATABASE_ATTNAME} setting.',
+            )
+        return using
+
+    def get_transaction(self) -> ContextManager[Any]:
+        # A durable block can't be nested in the transaction of the caller,
+        # so the lock on the sequence is released as soon as it's committed.
+        return transaction.atomic(
+            using=self.get_database_alias(),
+            durable=True,
+        )
+
+    def get_current_value(
+        self,
+        key: str,
+        default_value: int = 0,
+    ) -> int:
+        return get_sequence_model().get_current_value(
+            key,
+            default_value=default_value,
+            using=self.get_database_alias(),
+        )
+
+    def get_next_value(
+        self,
+        key: str,
+        nowait: bool = False,
+        increment: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        with self.get_transaction():
+            return get_sequence_model().get_next_value(
+                key,
+                nowait=nowait,
+                increment=increment,
+                retry_policy=retry_policy,
+                using=self.get_database_alias(),
+            )
+
+    def set_current_value(
+        self,
+        key: str,
+        value: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        with self.get_transaction():
+            return get_sequence_model().set_current_value(
+                key,
+                value,
+                nowait=nowait,
+                retry_policy=retry_policy,
+                using=self.get_database_alias(),
+            )
+
+    def return_values(
+        self,
+        key: str,
+        values: Sequence[int],
+    ) -> int:
+        return get_sequence_model().return_values(
+            key,
+            values,
+            using=self.get_database_alias(),
+        )
@@ -0,0 +1,108 @@
+import abc
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+)
+
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deconstruct import deconstructible
+
+from django_seq.conf import settings
+
+
+if TYPE_CHECKING:
+    from django_seq.models import AbstractSequence
+    from django_seq.retry import RetryPolicy
+
+
+__all__ = (
+    'Backend',
+    'SequenceBackend',
+)
+
+
+@deconstructible
+class SequenceBackend(abc.ABC):
+
+    using: Optional[str]
+
+    def __init__(
+        self,
+        using: Optional[str] = None,
+    ) -> None:
+        self.using = using
+
+    def __eq__(
+        self,
+        other: object,
+    ) -> bool:
+        if not isinstance(other, SequenceBackend):
+            return NotImplemented
+        return self.deconstruct() == other.deconstruct()  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        return hash(repr(self.deconstruct()))  # type: ignore[attr-defined]
+
+    def get_database_alias(self) -> str:
+        return self.using or settings.DATABASE or DEFAULT_DB_ALIAS
+
+    @abc.abstractmethod
+    def get_current_value(
+        self,
+        key: str,
+        default_value: int = 0,
+    ) -> int:
+        ...
+
+    @abc.abstractmethod
+    def get_next_value(
+        self,
+        key: str,
+        nowait: bool = False,
+        increment: int = 1,
+        retry_policy: Optional['RetryPolicy'] = None,
+    ) -> int:
+        ...
+
+    def get_next_values(
+        self,
+        key: str,
+        count: int,
+        nowait: bool = False,
+        retry_policy: Optional['RetryPolicy'] = None,
+    ) -> Sequence[int]:
+        if count < 1:
+            raise ValueError(f'count must be a positive integer, not {count!r}')
+        last_value = self.get_next_value(
+            key,
+            nowait=nowait,
+            increment=count,
+            retry_policy=retry_policy,
+        )
+        return range(last_value - count + 1, last_value + 1)
+
+    @abc.abstractmethod
+    def set_current_value(
+        self,
+        key: str,
+        value: int,
+        nowait: bool = False,
+        retry_policy: Optional['RetryPolicy'] = None,
+    ) -> int:
+        ...
+
+    def return_values(
+        self,
+        key: str,
+        values: Sequence[int],
+    ) -> int:
+        return 0
+
+
+Backend = Union[
+    Type['AbstractSequence'],
+    SequenceBackend,
+]
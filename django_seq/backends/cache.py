@@ -0,0 +1,158 @@
+from typing import Optional
+
+from django.core.cache import (
+    BaseCache,
+    caches,
+)
+
+from django_seq.backends.autonomous import AutonomousSequenceBackend
+from django_seq.backends.base import SequenceBackend
+from django_seq.retry import RetryPolicy
+from django_seq.utils import get_sequence_model
+
+
+__all__ = (
+    'CacheSequenceBackend',
+)
+
+
+class CacheSequenceBackend(SequenceBackend):
+
+    cache_alias: str
+
+    checkpoint_interval: int
+
+    margin: Optional[int]
+
+    key_prefix: str
+
+    def __init__(
+        self,
+        cache_alias: str = 'default',
+        checkpoint_interval: int = 1000,
+        margin: Optional[int] = None,
+        key_prefix: str = 'django_seq',
+        using: Optional[str] = None,
+    ) -> None:
+        if checkpoint_interval < 1:
+            raise ValueError(f'checkpoint_interval must be a positive integer, not {checkpoint_interval!r}')
+        if margin is not None and margin < checkpoint_interval:
+            raise ValueError(f'margin must be at least checkpoint_interval, not {margin!r}')
+        super(CacheSequenceBackend, self).__init__(using=using)
+        self.cache_alias = cache_alias
+        self.checkpoint_interval = checkpoint_interval
+        self.margin = margin
+        self.key_prefix = key_prefix
+
+    def get_autonomous_backend(self) -> AutonomousSequenceBackend:
+        # The counter can't be rolled back, so the sequence is written on
+        # a connection of its own, which isn't rolled back with the caller.
+        return AutonomousSequenceBackend(using=self.using)
+
+    def get_database_alias(self) -> str:
+        return self.get_autonomous_backend().get_database_alias()
+
+    def get_cache(self) -> BaseCache:
+        return caches[self.cache_alias]
+
+    def get_cache_key(
+        self,
+        key: str,
+    ) -> str:
+        return f'{self.key_prefix}:{key}'
+
+    def get_margin(self) -> int:
+        # A checkpoint may be lost with the transaction that writes it, so
+        # the default margin covers the values of two checkpoints.
+        if self.margin is not None:
+            return self.margin
+        return self.checkpoint_interval * 2
+
+    def seed(
+        self,
+        key: str,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
+        Sequence = get_sequence_model()
+        with self.get_autonomous_backend().get_transaction():
+            sequence, is_created = Sequence.get_or_create(
+                key,
+                nowait=nowait,
+                retry_policy=retry_policy,
+                using=self.get_database_alias(),
+            )
+        value = getattr(sequence, Sequence.VALUE_FIELD_NAME)
+        if not is_created:
+            # The values up to the margin above the last checkpoint may have
+            # been handed out before the cache was lost.
+            value = value + self.get_margin()
+        # Only the first of the concurrent seeds is stored.
+        self.get_cache().add(self.get_cache_key(key), value, timeout=None)
+
+    def checkpoint(
+        self,
+        key: str,
+        value: int,
+    ) -> bool:
+        Sequence = get_sequence_model()
+        # Checkpoints only move forward, since the concurrent writers may
+        # store them out of order.
+        with self.get_autonomous_backend().get_transaction():
+            return bool(
+                Sequence.objects.db_manager(self.get_database_alias()).filter(
+                    **Sequence.get_lookup(key),
+                    **{
+                        f'{Sequence.VALUE_FIELD_NAME}__lt': value,
+                    },
+                ).update(
+                    **Sequence.get_update_values(value),
+                ),
+            )
+
+    def get_current_value(
+        self,
+        key: str,
+        default_value: int = 0,
+    ) -> int:
+        value = self.get_cache().get(self.get_cache_key(key))
+        if value is not None:
+            return value
+        return self.get_autonomous_backend().get_current_value(
+            key,
+            default_value=default_value,
+        )
+
+    def get_next_value(
+        self,
+        key: str,
+        nowait: bool = False,
+        increment: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        cache = self.get_cache()
+        cache_key = self.get_cache_key(key)
+        try:
+            value = cache.incr(cache_key, increment)
+        except ValueError:
+            self.seed(key, nowait=nowait, retry_policy=retry_policy)
+            value = cache.incr(cache_key, increment)
+        if value // self.checkpoint_interval != (value - increment) // self.checkpoint_interval:
+            self.checkpoint(key, value)
+        return value
+
+    def set_current_value(
+        self,
+        key: str,
+        value: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        self.get_autonomous_backend().set_current_value(
+            key,
+            value,
+            nowait=nowait,
+            retry_policy=retry_policy,
+        )
+        self.get_cache().set(self.get_cache_key(key), value, timeout=None)
+        return value
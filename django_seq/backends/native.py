@@ -0,0 +1,206 @@
+import functools
+import re
+from typing import (
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from django.db import (
+    NotSupportedError,
+    connections,
+    transaction,
+)
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.utils import (
+    names_digest,
+    truncate_name,
+)
+
+from django_seq.backends.base import SequenceBackend
+from django_seq.retry import RetryPolicy
+
+
+__all__ = (
+    'NativeSequenceBackend',
+)
+
+
+class NativeSequenceBackend(SequenceBackend):
+
+    prefix: str
+
+    created_sequence_names: Set[Tuple[str, str]]
+
+    def __init__(
+        self,
+        using: Optional[str] = None,
+        prefix: str = 'django_seq__',
+    ) -> None:
+        super(NativeSequenceBackend, self).__init__(using=using)
+        self.prefix = prefix
+        self.created_sequence_names = set()
+
+    def get_connection(self) -> BaseDatabaseWrapper:
+        connection = connections[self.get_database_alias()]
+        if not self.is_supported(connection):
+            raise NotSupportedError(
+                f'Native sequences are not supported on {connection.display_name}.',
+            )
+        return connection
+
+    def is_supported(
+        self,
+        connection: BaseDatabaseWrapper,
+    ) -> bool:
+        if connection.vendor in ('postgresql', 'oracle'):
+            return True
+        if connection.vendor == 'mysql':
+            return bool(
+                getattr(connection, 'mysql_is_mariadb', False)
+                and getattr(connection, 'mysql_version', ()) >= (10, 3)
+            )
+        return False
+
+    def get_sequence_name(
+        self,
+        key: str,
+        connection: BaseDatabaseWrapper,
+    ) -> str:
+        name = self.prefix + re.sub(r'[^0-9a-zA-Z_]', '_', key).lower()
+        if name != self.prefix + key:
+            # Different keys may be sanitized into the same name, so the
+            # digest of the original key is appended.
+            name = f'{name}_{names_digest(key, length=8)}'
+        return truncate_name(name, connection.ops.max_name_length())
+
+    def ensure_sequence(
+        self,
+        key: str,
+        connection: BaseDatabaseWrapper,
+    ) -> str:
+        name = self.get_sequence_name(key, connection)
+        if (connection.alias, name) in self.created_sequence_names:
+            return name
+        quoted_name = connection.ops.quote_name(name)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS {quoted_name} MINVALUE 0 START WITH 1')
+            elif connection.vendor == 'mysql':
+                cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS {quoted_name} MINVALUE 0 START WITH 1 NOCACHE')
+            elif connection.vendor == 'oracle':
+                cursor.execute(
+                    'SELECT COUNT(*) FROM user_sequences WHERE sequence_name = %s',
+                    [name.upper()],
+                )
+                if not cursor.fetchone()[0]:
+                    cursor.execute(f'CREATE SEQUENCE {quoted_name} MINVALUE 0 START WITH 1 NOCACHE')
+        # On PostgreSQL, the sequence is dropped again if the transaction is
+        # rolled back, so it's only remembered once the transaction commits.
+        transaction.on_commit(
+            functools.partial(
+                self.created_sequence_names.add,
+                (connection.alias, name),
+            ),
+            using=connection.alias,
+        )
+        return name
+
+    def get_current_value(
+        self,
+        key: str,
+        default_value: int = 0,
+    ) -> int:
+        connection = self.get_connection()
+        name = self.get_sequence_name(key, connection)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT COALESCE(last_value, 0) FROM pg_sequences '
+                    'WHERE schemaname = current_schema() AND sequencename = %s',
+                    [name],
+                )
+                row = cursor.fetchone()
+                return default_value if row is None else int(row[0])
+            if connection.vendor == 'mysql':
+                cursor.execute(
+                    'SELECT 1 FROM information_schema.TABLES '
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND TABLE_TYPE = 'SEQUENCE'",
+                    [name],
+                )
+                if cursor.fetchone() is None:
+                    return default_value
+                cursor.execute(f'SELECT next_not_cached_value FROM {connection.ops.quote_name(name)}')
+                return int(cursor.fetchone()[0]) - 1
+            cursor.execute(
+                'SELECT last_number FROM user_sequences WHERE sequence_name = %s',
+                [name.upper()],
+            )
+            row = cursor.fetchone()
+            return default_value if row is None else int(row[0]) - 1
+
+    def get_next_value(
+        self,
+        key: str,
+        nowait: bool = False,
+        increment: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        if increment != 1:
+            raise NotSupportedError(
+                'Native sequences can only be advanced one value at a time.',
+            )
+        return self.get_next_values(key, 1)[0]
+
+    def get_next_values(
+        self,
+        key: str,
+        count: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> List[int]:
+        if count < 1:
+            raise ValueError(f'count must be a positive integer, not {count!r}')
+        connection = self.get_connection()
+        name = self.ensure_sequence(key, connection)
+        quoted_name = connection.ops.quote_name(name)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT nextval(%s::regclass) FROM generate_series(1, %s)',
+                    [quoted_name, count],
+                )
+                return [int(row[0]) for row in cursor.fetchall()]
+            if connection.vendor == 'mysql':
+                values: List[int] = []
+                for _ in range(count):
+                    cursor.execute(f'SELECT NEXTVAL({quoted_name})')
+                    values.append(int(cursor.fetchone()[0]))
+                return values
+            cursor.execute(
+                f'SELECT {quoted_name}.NEXTVAL FROM DUAL CONNECT BY LEVEL <= %s',
+                [count],
+            )
+            return [int(row[0]) for row in cursor.fetchall()]
+
+    def set_current_value(
+        self,
+        key: str,
+        value: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        connection = self.get_connection()
+        name = self.ensure_sequence(key, connection)
+        quoted_name = connection.ops.quote_name(name)
+        with connection.cursor() as cursor:
+            # Both MariaDB and Oracle only allow lowering the value of a
+            # sequence by restarting it, which can't be parameterized.
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT setval(%s::regclass, %s)', [quoted_name, value])
+            elif connection.vendor == 'mysql':
+                cursor.execute(f'ALTER SEQUENCE {quoted_name} RESTART WITH {int(value) + 1}')
+            else:
+                cursor.execute(f'ALTER SEQUENCE {quoted_name} RESTART START WITH {int(value) + 1}')
+        return value
@@ -0,0 +1,175 @@
+from typing import (
+    TYPE_CHECKING,
+    List,
+    Optional,
+    Sequence,
+)
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from django_seq.backends.base import SequenceBackend
+from django_seq.retry import RetryPolicy
+from django_seq.utils import get_sequence_model
+
+if TYPE_CHECKING:
+    from django_seq.models import ReleasedValue
+
+
+__all__ = (
+    'PooledSequenceBackend',
+)
+
+
+class PooledSequenceBackend(SequenceBackend):
+
+    size: int
+
+    def __init__(
+        self,
+        size: int = 100,
+        using: Optional[str] = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError(f'size must be a positive integer, not {size!r}')
+        super(PooledSequenceBackend, self).__init__(using=using)
+        self.size = size
+
+    def get_database_alias(self) -> str:
+        from django_seq.models import ReleasedValue
+
+        return ReleasedValue.get_database_alias(self.using)
+
+    def get_pool_queryset(
+        self,
+        key: str,
+    ) -> 'QuerySet[ReleasedValue]':
+        from django_seq.models import ReleasedValue
+
+        # The values released by the deleted instances share the table, but
+        # they are not part of the pool.
+        return ReleasedValue.objects.db_manager(self.get_database_alias()).filter(
+            **{
+                ReleasedValue.KEY_FIELD_NAME: key,
+                ReleasedValue.IS_POOLED_FIELD_NAME: True,
+            },
+        )
+
+    def get_pool_size(
+        self,
+        key: str,
+    ) -> int:
+        return self.get_pool_queryset(key).count()
+
+    def add_to_pool(
+        self,
+        key: str,
+        values: Sequence[int],
+    ) -> None:
+        from django_seq.models import ReleasedValue
+
+        ReleasedValue.objects.db_manager(self.get_database_alias()).bulk_create(
+            [
+                ReleasedValue(
+                    **{
+                        ReleasedValue.KEY_FIELD_NAME: key,
+                        ReleasedValue.VALUE_FIELD_NAME: value,
+                        ReleasedValue.IS_POOLED_FIELD_NAME: True,
+                    },
+                )
+                for value in values
+            ],
+            ignore_conflicts=True,
+        )
+
+    def refill(
+        self,
+        key: str,
+        size: Optional[int] = None,
+    ) -> int:
+        Sequence = get_sequence_model()
+        size = size or self.size
+        with transaction.atomic(using=Sequence.get_database_alias(self.using)):
+            # Locking the sequence first serializes the concurrent refills of
+            # the key, so the pool isn't filled over its size.
+            Sequence.get_or_create(key, using=self.using)
+            count = size - self.get_pool_size(key)
+            if count < 1:
+                return 0
+            self.add_to_pool(key, Sequence.get_next_values(key, count, using=self.using))
+        return count
+
+    def get_current_value(
+        self,
+        key: str,
+        default_value: int = 0,
+    ) -> int:
+        return get_sequence_model().get_current_value(
+            key,
+            default_value=default_value,
+            using=self.using,
+        )
+
+    def get_next_value(
+        self,
+        key: str,
+        nowait: bool = False,
+        increment: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        return self.get_next_values(
+            key,
+            increment,
+            nowait=nowait,
+            retry_policy=retry_policy,
+        )[-1]
+
+    def get_next_values(
+        self,
+        key: str,
+        count: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> Sequence[int]:
+        from django_seq.models import ReleasedValue
+
+        if count < 1:
+            raise ValueError(f'count must be a positive integer, not {count!r}')
+        values: List[int] = ReleasedValue.claim_many(key, count, using=self.using)
+        if len(values) < count:
+            # The pool is drained, so the missing values are generated by the
+            # sequence itself, which may wait for the concurrent writers.
+            values.extend(
+                get_sequence_model().get_next_values(
+                    key,
+                    count - len(values),
+                    nowait=nowait,
+                    retry_policy=retry_policy,
+                    using=self.using,
+                ),
+            )
+        return values
+
+    def return_values(
+        self,
+        key: str,
+        values: Sequence[int],
+    ) -> int:
+        self.add_to_pool(key, values)
+        return len(values)
+
+    def set_current_value(
+        self,
+        key: str,
+        value: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        self.get_pool_queryset(key).delete()
+        return get_sequence_model().set_current_value(
+            key,
+            value,
+            nowait=nowait,
+            retry_policy=retry_policy,
+            using=self.using,
+        )
@@ -0,0 +1,412 @@
+import contextlib
+import functools
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import (
+    Dict,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import (
+    connections,
+    transaction,
+)
+
+from django_seq.backends.base import (
+    Backend,
+    SequenceBackend,
+)
+from django_seq.retry import RetryPolicy
+from django_seq.utils import (
+    get_model_options,
+    get_sequence_model,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+
+__all__ = (
+    'SharedMemorySequenceBackend',
+)
+
+
+# Every slot holds the digest of a key, the range of the values which are
+# not handed out yet and the time when the range expires.
+SLOT = struct.Struct('<16sqqd')
+
+EMPTY_DIGEST = bytes(16)
+
+
+class SharedMemorySequenceBackend(SequenceBackend):
+
+    path: Optional[str]
+
+    block_size: int
+
+    slots: int
+
+    backend: Optional[Backend]
+
+    ttl: float
+
+    lock: threading.Lock
+
+    pid: Optional[int]
+
+    fd: int
+
+    table: Optional[mmap.mmap]
+
+    verified_blocks: Dict[bytes, Tuple[int, float]]
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        block_size: int = 1000,
+        slots: int = 4096,
+        backend: Optional[Backend] = None,
+        ttl: float = 60.0,
+    ) -> None:
+        if block_size < 1:
+            raise ValueError(f'block_size must be a positive integer, not {block_size!r}')
+        if slots < 1:
+            raise ValueError(f'slots must be a positive integer, not {slots!r}')
+        if ttl < 0:
+            raise ValueError(f'ttl must not be negative, not {ttl!r}')
+        super(SharedMemorySequenceBackend, self).__init__()
+        self.path = path
+        self.block_size = block_size
+        self.slots = slots
+        self.backend = backend
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.pid = None
+        self.fd = -1
+        self.table = None
+        self.verified_blocks = {}
+
+    def get_backend(self) -> Backend:
+        if self.backend is not None:
+            return self.backend
+        return get_sequence_model()
+
+    def get_database_alias(self) -> str:
+        return self.get_backend().get_database_alias()
+
+    def get_database_identity(self) -> str:
+        settings_dict = connections[self.get_database_alias()].settings_dict
+        return ':'.join(
+            str(settings_dict.get(name) or '')
+            for name in ('ENGINE', 'HOST', 'PORT', 'NAME')
+        )
+
+    def get_path(self) -> str:
+        if self.path is not None:
+            return self.path
+        # The file is shared by every process of the host, so every database
+        # has a file of its own.
+        database_digest = hashlib.blake2b(
+            self.get_database_identity().encode(),
+            digest_size=8,
+        ).hexdigest()
+        return os.path.join(self.get_directory(), f'{database_digest}.shm')
+
+    def get_directory(self) -> str:
+        # The temporary directory is writable by every user of the host, so
+        # the file is kept in a directory which only the user can access.
+        directory = os.path.join(tempfile.gettempdir(), f'django_seq-{os.getuid()}')
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+        stat = os.lstat(directory)
+        if not os.path.isdir(directory) or os.path.islink(directory) \
+                or stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+            raise ImproperlyConfigured(
+                f'{directory} must be a directory which is accessible only by its owner.',
+            )
+        return directory
+
+    def get_digest(
+        self,
+        key: str,
+    ) -> bytes:
+        # The digest identifies the database and the backend of the key as
+        # well, since the path of the file may be shared by the databases.
+        backend = self.get_backend()
+        if isinstance(backend, SequenceBackend):
+            backend_identity = repr(backend.deconstruct())  # type: ignore[attr-defined]
+        else:
+            backend_identity = get_model_options(backend).label
+        return hashlib.blake2b(
+            f'{self.get_database_identity()}:{backend_identity}:{key}'.encode(),
+            digest_size=16,
+        ).digest()
+
+    def ensure_table(self) -> mmap.mmap:
+        # The lock of the file is held by the open file description, which
+        # is shared with the parent process, so the file is opened again.
+        pid = os.getpid()
+        if self.table is not None and self.pid == pid:
+            return self.table
+        self.verified_blocks.clear()
+        if fcntl is None:
+            raise ImproperlyConfigured('SharedMemorySequenceBackend requires fcntl module.')
+        fd = os.open(self.get_path(), os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            size = os.fstat(fd).st_size
+            if size < SLOT.size * self.slots:
+                size = SLOT.size * self.slots
+                os.ftruncate(fd, size)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self.table = mmap.mmap(fd, size - size % SLOT.size)
+        self.fd = fd
+        self.pid = pid
+        return self.table
+
+    @contextlib.contextmanager
+    def open_table(self) -> Iterator[mmap.mmap]:
+        # File locks don't exclude the threads of the same process.
+        with self.lock:
+            table = self.ensure_table()
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                yield table
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def is_reusable(
+        self,
+        table: mmap.mmap,
+        offset: int,
+    ) -> bool:
+        slot_digest, next_value, last_value, expires_at = SLOT.unpack_from(table, offset)
+        return slot_digest == EMPTY_DIGEST or next_value > last_value or expires_at <= time.time()
+
+    def probe(
+        self,
+        table: mmap.mmap,
+        digest: bytes,
+    ) -> Tuple[Optional[int], Optional[int]]:
+        # The slots which are spent or expired are taken over by the other
+        # keys, but they are never emptied, so they stay in the probe
+        # sequences of their keys.
+        slots = len(table) // SLOT.size
+        start = int.from_bytes(digest[:8], 'little') % slots
+        reusable_offset: Optional[int] = None
+        for index in range(start, start + slots):
+            offset = (index % slots) * SLOT.size
+            slot_digest, _, _, _ = SLOT.unpack_from(table, offset)
+            if slot_digest == digest:
+                return offset, reusable_offset
+            if reusable_offset is None and self.is_reusable(table, offset):
+                reusable_offset = offset
+            if slot_digest == EMPTY_DIGEST:
+                break
+        return None, reusable_offset
+
+    def find_slot(
+        self,
+        table: mmap.mmap,
+        digest: bytes,
+        insert: bool = False,
+    ) -> Optional[int]:
+        offset, reusable_offset = self.probe(table, digest)
+        if offset is not None or not insert or reusable_offset is None:
+            return offset
+        SLOT.pack_into(table, reusable_offset, digest, 1, 0, 0.0)
+        return reusable_offset
+
+    def can_publish(
+        self,
+        table: mmap.mmap,
+        digest: bytes,
+    ) -> bool:
+        offset, reusable_offset = self.probe(table, digest)
+        return offset is not None or reusable_offset is not None
+
+    def is_verified(
+        self,
+        key: str,
+        digest: bytes,
+        last_value: int,
+        expires_at: float,
+    ) -> bool:
+        # A block may be left over from a database which is restored or
+        # flushed since, so every process checks the database once per block
+        # that the values of the block are still reserved.
+        block = (last_value, expires_at)
+        if self.verified_blocks.get(digest) == block:
+            return True
+        # Blocks which expire later than a block published now would, can't
+        # be published by this backend.
+        if expires_at > time.time() + self.ttl:
+            return False
+        if self.get_backend().get_current_value(key) < last_value:
+            return False
+        self.verified_blocks[digest] = block
+        return True
+
+    def take(
+        self,
+        table: mmap.mmap,
+        key: str,
+        digest: bytes,
+        count: int,
+    ) -> Optional[range]:
+        offset = self.find_slot(table, digest)
+        if offset is None:
+            return None
+        _, next_value, last_value, expires_at = SLOT.unpack_from(table, offset)
+        if last_value - next_value + 1 < count or expires_at <= time.time():
+            return None
+        if not self.is_verified(key, digest, last_value, expires_at):
+            SLOT.pack_into(table, offset, digest, 1, 0, 0.0)
+            return None
+        SLOT.pack_into(table, offset, digest, next_value + count, last_value, expires_at)
+        return range(next_value, next_value + count)
+
+    def publish(
+        self,
+        table: mmap.mmap,
+        digest: bytes,
+        values: Sequence[int],
+        replace: bool = False,
+    ) -> bool:
+        # Only contiguous values can be stored in a slot, and the remaining
+        # values of a slot are not replaced until they expire, unless they
+        # are too few to be taken.
+        if not isinstance(values, range) or values.step != 1 or not values:
+            return False
+        offset = self.find_slot(table, digest, insert=True)
+        if offset is None:
+            return False
+        now = time.time()
+        if not replace and not self.is_reusable(table, offset):
+            return False
+        expires_at = now + self.ttl
+        SLOT.pack_into(table, offset, digest, values[0], values[-1], expires_at)
+        self.verified_blocks[digest] = (values[-1], expires_at)
+        return True
+
+    def share(
+        self,
+        digest: bytes,
+        values: Sequence[int],
+    ) -> None:
+        with self.open_table() as table:
+            self.publish(table, digest, values)
+
+    def get_current_value(
+        self,
+        key: str,
+        default_value: int = 0,
+    ) -> int:
+        return self.get_backend().get_current_value(
+            key,
+            default_value=default_value,
+        )
+
+    def get_next_value(
+        self,
+        key: str,
+        nowait: bool = False,
+        increment: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        return self.get_next_values(
+            key,
+            increment,
+            nowait=nowait,
+            retry_policy=retry_policy,
+        )[-1]
+
+    def get_next_values(
+        self,
+        key: str,
+        count: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> Sequence[int]:
+        if count < 1:
+            raise ValueError(f'count must be a positive integer, not {count!r}')
+
+        backend = self.get_backend()
+        digest = self.get_digest(key)
+        using = backend.get_database_alias()
+
+        with self.open_table() as table:
+            values = self.take(table, key, digest, count)
+            if values is not None:
+                return values
+
+            # When there's no slot for the key, only the values which are
+            # handed out are allocated.
+            size = max(self.block_size, count) if self.can_publish(table, digest) else count
+
+            if not connections[using].in_atomic_block:
+                # The block is committed as soon as it's generated, so it's
+                # generated by one process while the others wait for it.
+                block = backend.get_next_values(
+                    key,
+                    size,
+                    nowait=nowait,
+                    retry_policy=retry_policy,
+                )
+                self.publish(table, digest, block[count:], replace=True)
+                return block[:count]
+
+        # Otherwise, the block is shared once the transaction is committed,
+        # and the file isn't locked while the sequence is locked, so the
+        # processes don't wait for each other's transactions.
+        block = backend.get_next_values(
+            key,
+            size,
+            nowait=nowait,
+            retry_policy=retry_policy,
+        )
+        if len(block) <= count:
+            return block
+        transaction.on_commit(
+            functools.partial(
+                self.share,
+                digest,
+                block[count:],
+            ),
+            using=using,
+        )
+        return block[:count]
+
+    def set_current_value(
+        self,
+        key: str,
+        value: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        value = self.get_backend().set_current_value(
+            key,
+            value,
+            nowait=nowait,
+            retry_policy=retry_policy,
+        )
+        digest = self.get_digest(key)
+        with self.open_table() as table:
+            offset = self.find_slot(table, digest)
+            if offset is not None:
+                SLOT.pack_into(table, offset, digest, 1, 0, 0.0)
+        return value
@@ -0,0 +1,148 @@
+import functools
+import operator
+import os
+import threading
+from typing import (
+    List,
+    Optional,
+    Sequence,
+)
+
+from django.db import transaction
+from django.db.models import Q
+
+from django_seq.backends.base import SequenceBackend
+from django_seq.retry import RetryPolicy
+from django_seq.utils import get_sequence_model
+
+
+__all__ = (
+    'StripedSequenceBackend',
+)
+
+
+class StripedSequenceBackend(SequenceBackend):
+
+    stripes: int
+
+    def __init__(
+        self,
+        stripes: int = 8,
+    ) -> None:
+        if stripes < 1:
+            raise ValueError(f'stripes must be a positive integer, not {stripes!r}')
+        super(StripedSequenceBackend, self).__init__()
+        self.stripes = stripes
+
+    def get_database_alias(self) -> str:
+        return get_sequence_model().get_database_alias()
+
+    def get_stripe(
+        self,
+        key: str,
+    ) -> int:
+        return hash((os.getpid(), threading.get_ident())) % self.stripes
+
+    def get_stripe_key(
+        self,
+        key: str,
+        stripe: int,
+    ) -> str:
+        return f'{key}#{stripe}'
+
+    def get_stripe_keys(
+        self,
+        key: str,
+    ) -> List[str]:
+        return [
+            self.get_stripe_key(key, stripe)
+            for stripe in range(self.stripes)
+        ]
+
+    def to_value(
+        self,
+        stripe: int,
+        stripe_value: int,
+    ) -> int:
+        # Stripe `i` hands out the values which are congruent to `i + 1`
+        # modulo the number of stripes, so the stripes never overlap.
+        return (stripe_value - 1) * self.stripes + stripe + 1
+
+    def get_current_value(
+        self,
+        key: str,
+        default_value: int = 0,
+    ) -> int:
+        Sequence = get_sequence_model()
+        stripe_keys = self.get_stripe_keys(key)
+        stripe_values = Sequence.objects.db_manager(Sequence.get_database_alias()).filter(
+            functools.reduce(
+                operator.or_,
+                (Q(**Sequence.get_lookup(stripe_key)) for stripe_key in stripe_keys),
+            ),
+        ).values_list(
+            Sequence.KEY_FIELD_NAME,
+            Sequence.VALUE_FIELD_NAME,
+        )
+        values = [
+            self.to_value(stripe_keys.index(stripe_key), stripe_value)
+            for stripe_key, stripe_value in stripe_values
+            if stripe_value > 0
+        ]
+        return max(values, default=default_value)
+
+    def get_next_value(
+        self,
+        key: str,
+        nowait: bool = False,
+        increment: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        return self.get_next_values(
+            key,
+            increment,
+            nowait=nowait,
+            retry_policy=retry_policy,
+        )[-1]
+
+    def get_next_values(
+        self,
+        key: str,
+        count: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> Sequence[int]:
+        stripe = self.get_stripe(key)
+        stripe_values = get_sequence_model().get_next_values(
+            self.get_stripe_key(key, stripe),
+            count,
+            nowait=nowait,
+            retry_policy=retry_policy,
+        )
+        return range(
+            self.to_value(stripe, stripe_values.start),
+            self.to_value(stripe, stripe_values.stop),
+            self.stripes,
+        )
+
+    def set_current_value(
+        self,
+        key: str,
+        value: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> int:
+        Sequence = get_sequence_model()
+        # The stripes are set together, so a failure doesn't leave some of
+        # the stripes set and the others not.
+        with transaction.atomic(using=Sequence.get_database_alias()):
+            for stripe, stripe_key in enumerate(self.get_stripe_keys(key)):
+                # The number of values up to `value` which belong to the stripe.
+                stripe_value = max((value - stripe - 1) // self.stripes + 1, 0)
+                Sequence.set_current_value(
+                    stripe_key,
+                    stripe_value,
+                    nowait=nowait,
+                    retry_policy=retry_policy,
+                )
+        return value
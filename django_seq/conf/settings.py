@@ -1,10 +1,35 @@
+from typing import Optional
+
 from django.conf import settings
 
+from django_seq.retry import RetryPolicy
+
 
 __all__ = (
     'SEQUENCE_MODEL_ATTNAME',
     'DEFAULT_SEQUENCE_MODEL',
     'SEQUENCE_MODEL',
+    'DATABASE_ATTNAME',
+    'DEFAULT_DATABASE',
+    'DATABASE',
+    'BLOCK_SIZE_ATTNAME',
+    'DEFAULT_BLOCK_SIZE',
+    'BLOCK_SIZE',
+    'BLOCK_TTL_ATTNAME',
+    'DEFAULT_BLOCK_TTL',
+    'BLOCK_TTL',
+    'BLOCK_MAX_KEYS_ATTNAME',
+    'DEFAULT_BLOCK_MAX_KEYS',
+    'BLOCK_MAX_KEYS',
+    'RETRY_POLICY_ATTNAME',
+    'DEFAULT_RETRY_POLICY',
+    'RETRY_POLICY',
+    'UPDATE_TIMESTAMPS_ATTNAME',
+    'DEFAULT_UPDATE_TIMESTAMPS',
+    'UPDATE_TIMESTAMPS',
+    'AUTONOMOUS_DATABASE_ATTNAME',
+    'DEFAULT_AUTONOMOUS_DATABASE',
+    'AUTONOMOUS_DATABASE',
     'reload',
 )
 
@@ -15,6 +40,48 @@ DEFAULT_SEQUENCE_MODEL = 'django_seq.Sequence'
 
 SEQUENCE_MODEL: str
 
+DATABASE_ATTNAME = 'DJANGO_SEQ_DATABASE'
+
+DEFAULT_DATABASE = None
+
+DATABASE: Optional[str]
+
+BLOCK_SIZE_ATTNAME = 'DJANGO_SEQ_BLOCK_SIZE'
+
+DEFAULT_BLOCK_SIZE = 1
+
+BLOCK_SIZE: int
+
+BLOCK_TTL_ATTNAME = 'DJANGO_SEQ_BLOCK_TTL'
+
+DEFAULT_BLOCK_TTL = None
+
+BLOCK_TTL: Optional[float]
+
+BLOCK_MAX_KEYS_ATTNAME = 'DJANGO_SEQ_BLOCK_MAX_KEYS'
+
+DEFAULT_BLOCK_MAX_KEYS = None
+
+BLOCK_MAX_KEYS: Optional[int]
+
+RETRY_POLICY_ATTNAME = 'DJANGO_SEQ_RETRY_POLICY'
+
+DEFAULT_RETRY_POLICY = None
+
+RETRY_POLICY: Optional[RetryPolicy]
+
+UPDATE_TIMESTAMPS_ATTNAME = 'DJANGO_SEQ_UPDATE_TIMESTAMPS'
+
+DEFAULT_UPDATE_TIMESTAMPS = True
+
+UPDATE_TIMESTAMPS: bool
+
+AUTONOMOUS_DATABASE_ATTNAME = 'DJANGO_SEQ_AUTONOMOUS_DATABASE'
+
+DEFAULT_AUTONOMOUS_DATABASE = None
+
+AUTONOMOUS_DATABASE: Optional[str]
+
 
 def reload() -> None:
 
@@ -27,5 +94,56 @@ def reload() -> None:
     if not hasattr(settings, SEQUENCE_MODEL_ATTNAME):
         setattr(settings, SEQUENCE_MODEL_ATTNAME, SEQUENCE_MODEL)
 
+    global DATABASE
+    DATABASE = getattr(
+        settings,
+        DATABASE_ATTNAME,
+        None,
+    ) or DEFAULT_DATABASE
+
+    global BLOCK_SIZE
+    BLOCK_SIZE = getattr(
+        settings,
+        BLOCK_SIZE_ATTNAME,
+        None,
+    ) or DEFAULT_BLOCK_SIZE
+
+    global BLOCK_TTL
+    BLOCK_TTL = getattr(
+        settings,
+        BLOCK_TTL_ATTNAME,
+        None,
+    ) or DEFAULT_BLOCK_TTL
+
+    global BLOCK_MAX_KEYS
+    BLOCK_MAX_KEYS = getattr(
+        settings,
+        BLOCK_MAX_KEYS_ATTNAME,
+        None,
+    ) or DEFAULT_BLOCK_MAX_KEYS
+
+    global RETRY_POLICY
+    RETRY_POLICY = getattr(
+        settings,
+        RETRY_POLICY_ATTNAME,
+        None,
+    ) or DEFAULT_RETRY_POLICY
+    if isinstance(RETRY_POLICY, dict):
+        RETRY_POLICY = RetryPolicy(**RETRY_POLICY)
+
+    global UPDATE_TIMESTAMPS
+    UPDATE_TIMESTAMPS = getattr(
+        settings,
+        UPDATE_TIMESTAMPS_ATTNAME,
+        DEFAULT_UPDATE_TIMESTAMPS,
+    )
+
+    global AUTONOMOUS_DATABASE
+    AUTONOMOUS_DATABASE = getattr(
+        settings,
+        AUTONOMOUS_DATABASE_ATTNAME,
+        None,
+    ) or DEFAULT_AUTONOMOUS_DATABASE
+
 
 reload()
@@ -1,7 +1,8 @@
-from typing import Optional, TYPE_CHECKING, Type
+from typing import Dict, List, Optional, TYPE_CHECKING, Type
 
 from django.db.models import Model, signals
 
+from django_seq.allocation import ModelAllocator
 from django_seq.fields import SequenceField
 from django_seq.utils import get_model_options
 
@@ -25,16 +26,41 @@ class Connector:
             from django_seq.globals import registry as _registry
             registry = _registry
         assert registry is not None  # noqa
+        model_fields: Dict[Type[Model], Dict[str, SequenceField]] = {}
         for parent_model, field_name, field in registry.model_sequence_field_pairs:
             models = [parent_model, *parent_model.__subclasses__()]
             for model in models:
                 model_options = get_model_options(model)
                 if model_options.abstract:
                     continue
-                cls.connect_pre_save(model, field_name, field)
+                model_fields.setdefault(model, {}).setdefault(field_name, field)
+                if field.recycle_values:
+                    cls.connect_post_delete(model, field_name, field)
+        for model, fields in model_fields.items():
+            cls.connect_pre_save(model, list(fields.values()))
 
     @classmethod
     def connect_pre_save(
+        cls,
+        model: Type[Model],
+        sequence_fields: List[SequenceField],
+    ) -> None:
+        model_options = get_model_options(model)
+
+        for sequence_field in sequence_fields:
+            sequence_field.get_compiled_key(model)
+
+        # A single receiver allocates the values of all sequence fields of
+        # the model, so they can be allocated by a single statement.
+        signals.pre_save.connect(
+            ModelAllocator(sequence_fields).handle_pre_save_signal,
+            sender=model,
+            weak=False,
+            dispatch_uid=f'{model_options.app_label}.{model_options.label}.set_default_values',
+        )
+
+    @classmethod
+    def connect_post_delete(
         cls,
         model: Type[Model],
         field_name: str,
@@ -42,8 +68,8 @@ class Connector:
     ) -> None:
         model_options = get_model_options(model)
 
-        signals.pre_save.connect(
-            sequence_field.handle_pre_save_signal,
+        signals.post_delete.connect(
+            sequence_field.handle_post_delete_signal,
             sender=model,
-            dispatch_uid=f'{model_options.app_label}.{model_options.label}.{field_name}.set_default_value',
+            dispatch_uid=f'{model_options.app_label}.{model_options.label}.{field_name}.release_value',
         )
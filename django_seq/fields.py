@@ -1,7 +1,12 @@
+import functools
+import time
 from typing import (
     Any,
     Callable,
     Dict,
+    Iterable,
+    List,
+    Mapping,
     Optional,
     Sequence,
     Tuple,
@@ -11,19 +16,32 @@ from typing import (
     cast,
 )
 
+from django.db import (
+    router,
+    transaction,
+)
 from django.db.models import (
-    F,
     Max,
     Model,
     NOT_PROVIDED,
-    OuterRef,
-    Q,
-    Subquery,
+    QuerySet,
 )
 from django.db.models.constants import LOOKUP_SEP
 
 from django_seq._typing import PositiveBigIntegerField
+from django_seq.backends import (
+    Backend,
+    SequenceBackend,
+)
+from django_seq.conf import settings
+from django_seq.gaps import GapFinder
+from django_seq.instrumentation import (
+    AllocationEvent,
+    measure,
+)
+from django_seq.retry import RetryPolicy
 from django_seq.segmentation import (
+    CompiledKey,
     Key,
     SequenceKeyEvaluator,
 )
@@ -61,6 +79,16 @@ class SequenceField(
 
     resolve_integrity_errors: bool | Callable[[Model], bool]
 
+    block_size: Optional[int]
+
+    recycle_values: bool | Callable[[Model], bool]
+
+    backend: Optional[SequenceBackend]
+
+    retry_policy: Optional[RetryPolicy]
+
+    compiled_keys: Dict[Type[Model], CompiledKey]
+
     def __init__(
         self,
         *args,
@@ -73,6 +101,10 @@ class SequenceField(
         nowait: bool = False,
         fill_gaps: bool | Callable[[Model], bool] = False,
         resolve_integrity_errors: bool | Callable[[Model], bool] = False,
+        block_size: Optional[int] = None,
+        recycle_values: bool | Callable[[Model], bool] = False,
+        backend: Optional[SequenceBackend] = None,
+        retry_policy: Optional[RetryPolicy] = None,
         blank: bool = True,
         null: bool = False,
         editable: bool = False,
@@ -88,155 +120,359 @@ class SequenceField(
         self.nowait = nowait
         self.fill_gaps = fill_gaps
         self.resolve_integrity_errors = resolve_integrity_errors
+        self.block_size = block_size
+        self.recycle_values = recycle_values
+        self.backend = backend
+        self.retry_policy = retry_policy
+        self.compiled_keys = {}
         super(SequenceField, self).__init__(*args, **kwargs)
 
     def deconstruct(self) -> Tuple[str, str, Sequence[Any], Dict[str, Any]]:
         name, key, args, kwargs = super(SequenceField, self).deconstruct()
         key = 'django_seq.models.SequenceField'
-        kwargs['key'] = self.key
-        kwargs['separator'] = self.separator
-        kwargs['nowait'] = self.nowait
-        kwargs['fill_gaps'] = self.fill_gaps
-        kwargs['resolve_integrity_errors'] = self.resolve_integrity_errors
+        # Like the arguments of Django's fields, the arguments which have
+        # their default values are omitted.
+        defaults: Dict[str, Any] = {
+            'key': NOT_PROVIDED,
+            'separator': '.',
+            'nowait': False,
+            'fill_gaps': False,
+            'resolve_integrity_errors': False,
+            'block_size': None,
+            'recycle_values': False,
+            'backend': None,
+            'retry_policy': None,
+        }
+        for attname, default in defaults.items():
+            value = getattr(self, attname)
+            if value is not default and value != default:
+                kwargs[attname] = value
         return name, key, args, kwargs
 
-    def handle_pre_save_signal(
+    def get_backend(self) -> Backend:
+        if self.backend is not None:
+            return self.backend
+        return get_sequence_model()
+
+    def get_block_size(self) -> int:
+        if self.block_size is not None:
+            return self.block_size
+        return settings.BLOCK_SIZE
+
+    def get_key(
         self,
         sender: Type[Model],
-        instance: Model,
-        **kwargs,
-    ) -> bool:
-        value = getattr(instance, self.name, None)
-        if value is not None or self.default is not NOT_PROVIDED:
-            return False
-
+    ) -> Optional[Key]:
         model_options = get_model_options(sender)
 
-        key = (
+        return (
             cast(Optional[Key], self.key)
             if self.key is not NOT_PROVIDED
             else model_options.db_table
         )
 
-        evaluated_key = SequenceKeyEvaluator.evaluate(
-            instance,
-            key,
-            separator=self.separator,
-        )
-
-        if not evaluated_key:
-            return False
+    def get_separator(self) -> str:
+        from django_seq.models import AbstractStructuredSequence
 
+        # Structured sequence models split the keys into their columns by
+        # their own separator.
         sequence_model = get_sequence_model()
+        if issubclass(sequence_model, AbstractStructuredSequence):
+            return sequence_model.KEY_SEPARATOR
+        return self.separator
+
+    def get_compiled_key(
+        self,
+        sender: Type[Model],
+    ) -> CompiledKey:
+        compiled_key = self.compiled_keys.get(sender)
+        if compiled_key is None:
+            compiled_key = SequenceKeyEvaluator.compile(
+                self.get_key(sender),
+                separator=self.get_separator(),
+                model=sender,
+            )
+            self.compiled_keys[sender] = compiled_key
+        return compiled_key
+
+    def evaluate_key(
+        self,
+        sender: Type[Model],
+        instance: Model,
+    ) -> Optional[str]:
+        return self.get_compiled_key(sender).evaluate(instance)
+
+    def get_partition_queryset(
+        self,
+        sender: Type[Model],
+        instance: Model,
+    ) -> QuerySet:
+        return sender.objects.filter(
+            **self.get_compiled_key(sender).get_partition_lookups(instance),
+        )
 
+    def should_fill_gaps(
+        self,
+        instance: Model,
+    ) -> bool:
         should_fill_gaps = self.fill_gaps
         if callable(should_fill_gaps):
             should_fill_gaps = should_fill_gaps(instance)
+        return bool(should_fill_gaps)
 
-        should_resolve_integrity_errors: bool | Callable[[Model], bool] = False
-        if not should_fill_gaps:
-            should_resolve_integrity_errors = self.resolve_integrity_errors
-            if callable(should_resolve_integrity_errors):
-                should_resolve_integrity_errors = should_resolve_integrity_errors(instance)
+    def should_resolve_integrity_errors(
+        self,
+        instance: Model,
+    ) -> bool:
+        should_resolve_integrity_errors = self.resolve_integrity_errors
+        if callable(should_resolve_integrity_errors):
+            should_resolve_integrity_errors = should_resolve_integrity_errors(instance)
+        return bool(should_resolve_integrity_errors)
 
-        if should_fill_gaps:
-            next_number_sub_queryset = sender.objects.order_by(
-                self.name,
-            ).filter(
-                **{LOOKUP_SEP.join([self.name, 'gt']): OuterRef(self.name)},
-            ).values(
-                self.name,
-            )[:1]
+    def should_recycle_values(
+        self,
+        instance: Model,
+    ) -> bool:
+        should_recycle_values = self.recycle_values
+        if callable(should_recycle_values):
+            should_recycle_values = should_recycle_values(instance)
+        return bool(should_recycle_values)
+
+    def can_allocate_in_bulk(self) -> bool:
+        return (
+            self.backend is None
+            and self.get_block_size() <= 1
+            and not self.nowait
+        )
 
-            gaps = sender.objects.order_by(
+    def get_target_mode(
+        self,
+        instance: Model,
+    ) -> Optional[str]:
+        if self.should_fill_gaps(instance):
+            return 'fill_gaps'
+        if self.should_resolve_integrity_errors(instance):
+            return 'resolve_integrity_errors'
+        return None
+
+    def get_target_value(
+        self,
+        sender: Type[Model],
+        instance: Model,
+        evaluated_key: str,
+        backend: Backend,
+        mode: str,
+    ) -> int:
+        partition_queryset = self.get_partition_queryset(sender, instance)
+
+        if mode == 'fill_gaps':
+            first_gap = GapFinder.find(
+                partition_queryset,
                 self.name,
-            ).annotate(
-                next_number=Subquery(next_number_sub_queryset),
-            ).filter(
-                (
-                    Q(
-                        **{LOOKUP_SEP.join(['next_number', 'isnull']): True},
-                    )
-                    | ~Q(
-                        next_number=F(self.name) + 1,
-                    )
+            )
+        else:
+            first_gap = GapFinder.find(
+                partition_queryset.filter(
+                    **{LOOKUP_SEP.join([self.name, 'gt']): backend.get_current_value(evaluated_key)},
                 ),
+                self.name,
             )
 
-            first_gap = gaps.first()
+        current_value: int
 
-            current_value: int
+        if first_gap is not None:
+            current_value = first_gap
+        else:
+            current_value = partition_queryset.aggregate(
+                max_value=Max(
+                    self.name,
+                    default=0,
+                    output_field=self.__class__(),
+                ),
+            )['max_value']
 
-            if first_gap is not None:
-                current_value = getattr(first_gap, self.name)
-            else:
-                current_value = sender.objects.aggregate(
-                    max_value=Max(
-                        self.name,
-                        default=0,
-                        output_field=self.__class__(),
-                    ),
-                )['max_value']
+        return current_value + 1
 
-            value = current_value + 1
+    def should_generate(
+        self,
+        instance: Model,
+    ) -> bool:
+        value = getattr(instance, self.name, None)
+        return value is None and self.default is NOT_PROVIDED
 
-            sequence_model.set_current_value(evaluated_key, value)
+    def handle_pre_save_signal(
+        self,
+        sender: Type[Model],
+        instance: Model,
+        **kwargs,
+    ) -> bool:
+        if not self.should_generate(instance):
+            return False
 
-        elif should_resolve_integrity_errors:
-            current_value = sequence_model.get_current_value(evaluated_key)
+        started_at = time.perf_counter()
 
-            next_number_sub_queryset = sender.objects.order_by(
-                self.name,
-            ).filter(
-                **{LOOKUP_SEP.join([self.name, 'gt']): OuterRef(self.name)},
-            ).values(
-                self.name,
-            )[:1]
+        evaluated_key = self.evaluate_key(sender, instance)
 
-            gaps = sender.objects.order_by(
-                self.name,
-            ).filter(
-                **{LOOKUP_SEP.join([self.name, 'gt']): current_value},
-            ).annotate(
-                next_number=Subquery(next_number_sub_queryset),
-            ).filter(
-                (
-                    Q(
-                        **{LOOKUP_SEP.join(['next_number', 'isnull']): True},
-                    )
-                    | ~Q(
-                        next_number=F(self.name) + 1,
-                    )
-                ),
-            )
+        key_evaluation_duration = time.perf_counter() - started_at
 
-            first_gap = gaps.first()
+        if not evaluated_key:
+            return False
 
-            if first_gap is not None:
-                current_value = getattr(first_gap, self.name)
-            else:
-                current_value = sender.objects.aggregate(
-                    max_value=Max(
-                        self.name,
-                        default=0,
-                        output_field=self.__class__(),
-                    ),
-                )['max_value']
+        self.allocate(sender, instance, evaluated_key, key_evaluation_duration)
 
-            value = current_value + 1
+        return True
 
-            sequence_model.set_current_value(evaluated_key, value)
+    def allocate(
+        self,
+        sender: Type[Model],
+        instance: Model,
+        evaluated_key: str,
+        key_evaluation_duration: float = 0.0,
+    ) -> int:
+        backend = self.get_backend()
 
-        else:
-            value = sequence_model.get_next_value(
-                evaluated_key,
-                nowait=self.nowait,
-            )
+        def get_aliases() -> List[str]:
+            return [
+                backend.get_database_alias(),
+                router.db_for_write(sender, instance=instance),
+            ]
+
+        with measure(sender, 'pre_save', evaluated_key, get_aliases) as event:
+            event.key_evaluation_duration = key_evaluation_duration
+            value = self.get_value(sender, instance, evaluated_key, backend, event)
 
         setattr(instance, self.name, value)
 
+        return value
+
+    def get_value(
+        self,
+        sender: Type[Model],
+        instance: Model,
+        evaluated_key: str,
+        backend: Backend,
+        event: AllocationEvent,
+    ) -> int:
+        mode = self.get_target_mode(instance)
+
+        if mode is not None:
+            event.mode = mode
+
+            value = self.get_target_value(sender, instance, evaluated_key, backend, mode)
+
+            with event.measure_lock():
+                backend.set_current_value(evaluated_key, value)
+
+        else:
+            from django_seq.globals import block_allocator
+            from django_seq.models import ReleasedValue
+
+            released_value: Optional[int] = None
+            if self.should_recycle_values(instance):
+                with event.measure_lock():
+                    released_value = ReleasedValue.claim(evaluated_key)
+
+            if released_value is not None:
+                event.mode = 'recycle_values'
+                value = released_value
+            else:
+                event.mode = 'nowait' if self.nowait else 'plain'
+                with event.measure_lock():
+                    value = block_allocator.get_next_value(
+                        backend,
+                        evaluated_key,
+                        self.get_block_size(),
+                        nowait=self.nowait,
+                        retry_policy=self.retry_policy,
+                    )
+
+        return value
+
+    def handle_post_delete_signal(
+        self,
+        sender: Type[Model],
+        instance: Model,
+        **kwargs,
+    ) -> bool:
+        from django_seq.models import ReleasedValue
+
+        value = getattr(instance, self.name, None)
+        if value is None or not self.should_recycle_values(instance):
+            return False
+
+        evaluated_key = self.evaluate_key(sender, instance)
+
+        if not evaluated_key:
+            return False
+
+        # The value is released on the alias of the sequences, so it's only
+        # released once the deletion is committed.
+        transaction.on_commit(
+            functools.partial(ReleasedValue.release, evaluated_key, value),
+            using=router.db_for_write(sender, instance=instance),
+        )
+
         return True
 
+    def handle_bulk_create(
+        self,
+        sender: Type[Model],
+        instances: Iterable[Model],
+    ) -> int:
+        if self.default is not NOT_PROVIDED:
+            return 0
+
+        grouped_instances: Dict[str, List[Model]] = {}
+
+        for instance in instances:
+            if getattr(instance, self.name, None) is not None:
+                continue
+
+            evaluated_key = self.evaluate_key(sender, instance)
+
+            if not evaluated_key:
+                continue
+
+            if self.should_fill_gaps(instance) or self.should_resolve_integrity_errors(instance):
+                raise ValueError(
+                    f"{sender.__qualname__}.{self.name} can't be generated in bulk "
+                    f"when fill_gaps or resolve_integrity_errors is enabled.",
+                )
+
+            grouped_instances.setdefault(evaluated_key, []).append(instance)
+
+        if not grouped_instances:
+            return 0
+
+        backend = self.get_backend()
+
+        key_values: Mapping[str, Sequence[int]]
+        if self.backend is None and not self.nowait:
+            key_values = get_sequence_model().get_next_values_for_keys(
+                {
+                    evaluated_key: len(key_instances)
+                    for evaluated_key, key_instances in grouped_instances.items()
+                },
+            )
+        else:
+            # Keys are reserved in a deterministic order, to prevent deadlocks
+            # between concurrent bulk creates sharing some of the keys.
+            key_values = {
+                evaluated_key: backend.get_next_values(
+                    evaluated_key,
+                    len(grouped_instances[evaluated_key]),
+                    nowait=self.nowait,
+                    retry_policy=self.retry_policy,
+                )
+                for evaluated_key in sorted(grouped_instances)
+            }
+
+        for evaluated_key, key_instances in grouped_instances.items():
+            for instance, value in zip(key_instances, key_values[evaluated_key]):
+                setattr(instance, self.name, value)
+
+        return sum(map(len, grouped_instances.values()))
+
     def contribute_to_class(
         self,
         model: Type[Model],
@@ -0,0 +1,96 @@
+from typing import (
+    Optional,
+    cast,
+)
+
+from django.db import connections
+from django.db.models import (
+    F,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Window,
+)
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Lead
+
+
+__all__ = (
+    'GapFinder',
+)
+
+
+class GapFinder:
+
+    @classmethod
+    def find(
+        cls,
+        queryset: QuerySet,
+        field_name: str,
+    ) -> Optional[int]:
+        connection = connections[queryset.db]
+        if connection.features.supports_over_clause:
+            return cls.find_with_window(queryset, field_name)
+        return cls.find_with_subquery(queryset, field_name)
+
+    @classmethod
+    def find_with_window(
+        cls,
+        queryset: QuerySet,
+        field_name: str,
+    ) -> Optional[int]:
+        gaps = queryset.annotate(
+            next_number=Window(
+                Lead(field_name),
+                order_by=F(field_name).asc(),
+            ),
+        ).filter(
+            cls.get_gap_condition(field_name),
+        ).order_by(
+            field_name,
+        ).values_list(
+            field_name,
+            flat=True,
+        )
+        return cast(Optional[int], gaps.first())
+
+    @classmethod
+    def find_with_subquery(
+        cls,
+        queryset: QuerySet,
+        field_name: str,
+    ) -> Optional[int]:
+        next_number_sub_queryset = queryset.order_by(
+            field_name,
+        ).filter(
+            **{LOOKUP_SEP.join([field_name, 'gt']): OuterRef(field_name)},
+        ).values(
+            field_name,
+        )[:1]
+
+        gaps = queryset.order_by(
+            field_name,
+        ).annotate(
+            next_number=Subquery(next_number_sub_queryset),
+        ).filter(
+            cls.get_gap_condition(field_name),
+        ).values_list(
+            field_name,
+            flat=True,
+        )
+        return cast(Optional[int], gaps.first())
+
+    @classmethod
+    def get_gap_condition(
+        cls,
+        field_name: str,
+    ) -> Q:
+        return (
+            Q(
+                **{LOOKUP_SEP.join(['next_number', 'isnull']): True},
+            )
+            | ~Q(
+                next_number=F(field_name) + 1,
+            )
+        )
@@ -1,9 +1,13 @@
+from django_seq.allocation import BlockAllocator
 from django_seq.registry import Registry
 
 
 __all__ = (
     'registry',
+    'block_allocator',
 )
 
 
 registry = Registry()
+
+block_allocator = BlockAllocator()
@@ -0,0 +1,202 @@
+import contextlib
+import dataclasses
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+)
+
+from django.db import connections
+
+from django_seq.signals import allocation_measured
+
+
+__all__ = (
+    'AllocationEvent',
+    'measure',
+    'PrometheusCollector',
+)
+
+
+@dataclasses.dataclass()
+class AllocationEvent:
+
+    operation: str
+
+    key: str
+
+    mode: str = ''
+
+    duration: float = 0.0
+
+    key_evaluation_duration: float = 0.0
+
+    lock_duration: float = 0.0
+
+    round_trips: int = 0
+
+    retries: int = 0
+
+    @contextlib.contextmanager
+    def measure_lock(self) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.lock_duration += time.perf_counter() - started_at
+
+    def count_round_trip(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: Dict[str, Any],
+    ) -> Any:
+        self.round_trips += 1
+        return execute(sql, params, many, context)
+
+
+@contextlib.contextmanager
+def measure(
+    sender: Any,
+    operation: str,
+    key: str,
+    get_aliases: Callable[[], Iterable[str]],
+) -> Iterator[AllocationEvent]:
+    event = AllocationEvent(
+        operation=operation,
+        key=key,
+    )
+    # Queries are only counted when somebody listens to the events, and the
+    # aliases, which may be routed, are only resolved then.
+    if not allocation_measured.has_listeners(sender):
+        yield event
+        return
+    with contextlib.ExitStack() as stack:
+        for alias in dict.fromkeys(get_aliases()):
+            stack.enter_context(
+                connections[alias].execute_wrapper(event.count_round_trip),
+            )
+        started_at = time.perf_counter()
+        yield event
+        event.duration = time.perf_counter() - started_at
+    allocation_measured.send(
+        sender=sender,
+        event=event,
+    )
+
+
+class PrometheusCollector:
+
+    DEFAULT_BUCKETS = (
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+    )
+
+    HISTOGRAMS = (
+        ('duration', 'django_seq_allocation_duration_seconds', 'Time spent allocating sequence values.'),
+        ('lock_duration', 'django_seq_lock_duration_seconds', 'Time spent acquiring sequence row locks.'),
+        ('key_evaluation_duration', 'django_seq_key_evaluation_duration_seconds', 'Time spent evaluating keys.'),
+    )
+
+    COUNTERS = (
+        ('round_trips', 'django_seq_round_trips_total', 'Database round trips made by allocations.'),
+        ('retries', 'django_seq_retries_total', 'Retried allocations.'),
+    )
+
+    lock: threading.Lock
+
+    buckets: Tuple[float, ...]
+
+    histograms: Dict[Tuple[str, str, str], Tuple[List[int], float, int]]
+
+    counters: Dict[Tuple[str, str, str], int]
+
+    def __init__(
+        self,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.lock = threading.Lock()
+        self.buckets = tuple(sorted(buckets))
+        self.histograms = {}
+        self.counters = {}
+
+    def connect(self) -> None:
+        allocation_measured.connect(
+            self.receive,
+            dispatch_uid=f'django_seq.instrumentation.PrometheusCollector.{id(self)}',
+        )
+
+    def disconnect(self) -> None:
+        allocation_measured.disconnect(
+            dispatch_uid=f'django_seq.instrumentation.PrometheusCollector.{id(self)}',
+        )
+
+    def receive(
+        self,
+        sender: Any,
+        event: AllocationEvent,
+        **kwargs: Any,
+    ) -> None:
+        with self.lock:
+            for attname, name, _ in self.HISTOGRAMS:
+                self.observe((name, event.operation, event.mode), getattr(event, attname))
+            for attname, name, _ in self.COUNTERS:
+                counter_key = (name, event.operation, event.mode)
+                self.counters[counter_key] = self.counters.get(counter_key, 0) + getattr(event, attname)
+
+    def observe(
+        self,
+        histogram_key: Tuple[str, str, str],
+        value: float,
+    ) -> None:
+        bucket_counts, total, count = self.histograms.get(
+            histogram_key,
+            ([0] * len(self.buckets), 0.0, 0),
+        )
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                bucket_counts[idx] += 1
+        self.histograms[histogram_key] = (bucket_counts, total + value, count + 1)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self.lock:
+            for _, name, documentation in self.HISTOGRAMS:
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} histogram')
+                for histogram_key, (bucket_counts, total, count) in sorted(self.histograms.items()):
+                    histogram_name, operation, mode = histogram_key
+                    if histogram_name != name:
+                        continue
+                    labels = f'operation="{operation}",mode="{mode}"'
+                    for bound, bucket_count in zip(self.buckets, bucket_counts):
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {bucket_count}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+                    lines.append(f'{name}_sum{{{labels}}} {total}')
+                    lines.append(f'{name}_count{{{labels}}} {count}')
+            for _, name, documentation in self.COUNTERS:
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} counter')
+                for (counter_name, operation, mode), value in sorted(self.counters.items()):
+                    if counter_name != name:
+                        continue
+                    lines.append(f'{name}{{operation="{operation}",mode="{mode}"}} {value}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,34 @@
+from typing import Any
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandParser,
+)
+
+from django_seq.backends import PooledSequenceBackend
+
+
+class Command(BaseCommand):
+
+    help = 'Tops up the pools of pre-generated values of the given sequence keys.'
+
+    def add_arguments(
+        self,
+        parser: CommandParser,
+    ) -> None:
+        parser.add_argument('keys', nargs='+', type=str)
+        parser.add_argument('--size', type=int, default=100)
+        parser.add_argument('--database', type=str, default=None)
+
+    def handle(
+        self,
+        *args: Any,
+        **options: Any,
+    ) -> None:
+        backend = PooledSequenceBackend(
+            size=options['size'],
+            using=options['database'],
+        )
+        for key in options['keys']:
+            count = backend.refill(key)
+            self.stdout.write(f'{key}: {count} values added')
@@ -0,0 +1,56 @@
+from typing import (
+    Any,
+    Iterable,
+    List,
+    TypeVar,
+)
+
+from django.db import models
+
+from django_seq.fields import SequenceField
+from django_seq.utils import get_model_options
+
+
+__all__ = (
+    'SequenceQuerySetMixin',
+    'SequenceQuerySet',
+    'SequenceManager',
+)
+
+
+MT = TypeVar('MT', bound=models.Model)
+
+
+class SequenceQuerySetMixin:
+
+    model: Any
+
+    def bulk_create(
+        self,
+        objs: Iterable[MT],
+        *args: Any,
+        **kwargs: Any,
+    ) -> List[MT]:
+        objs = list(objs)
+        model_options = get_model_options(self.model)
+        for field in model_options.concrete_fields:
+            if isinstance(field, SequenceField):
+                field.handle_bulk_create(self.model, objs)
+        return super(SequenceQuerySetMixin, self).bulk_create(  # type: ignore[misc]
+            objs,
+            *args,
+            **kwargs,
+        )
+
+
+class SequenceQuerySet(
+    SequenceQuerySetMixin,
+    models.QuerySet[MT],
+):
+    ...
+
+
+class SequenceManager(
+    models.Manager.from_queryset(SequenceQuerySet),  # type: ignore[misc]
+):
+    ...
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_seq', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReleasedValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.TextField(verbose_name='key')),
+                ('value', models.PositiveBigIntegerField(verbose_name='value')),
+            ],
+            options={
+                'verbose_name': 'released value',
+                'verbose_name_plural': 'released values',
+                'db_table': 'django_seq__released_values',
+                'unique_together': {('key', 'value')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+from django_seq.operations import AlterSwappableField
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_seq', '0002_releasedvalue'),
+    ]
+
+    operations = [
+        AlterSwappableField(
+            model_name='sequence',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='updated at'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_seq', '0003_alter_sequence_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='releasedvalue',
+            name='is_pooled',
+            field=models.BooleanField(default=False, verbose_name='is pooled'),
+        ),
+    ]
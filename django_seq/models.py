@@ -1,28 +1,60 @@
+import contextlib
 import datetime
+import re
+import uuid
 from typing import (
     Any,
+    ContextManager,
     Dict,
+    List,
     Optional,
+    Sequence as SequenceType,
     Tuple,
     Union,
 )
 
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import (
+    connections,
+    models,
+    router,
+    transaction,
+)
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from django_seq._typing import (
+    BigIntegerField,
+    BooleanField,
+    CharField,
     DateTimeField,
     PositiveBigIntegerField,
     TextField,
+    UUIDField,
 )
 from django_seq.conf import settings
 from django_seq.fields import SequenceField
+from django_seq.instrumentation import (
+    AllocationEvent,
+    measure,
+)
+from django_seq.managers import (
+    SequenceManager,
+    SequenceQuerySet,
+    SequenceQuerySetMixin,
+)
+from django_seq.retry import RetryPolicy
 from django_seq.segmentation import (
     Key,
     Segment,
     SequenceKeyEvaluator,
 )
-from django_seq.utils import get_sequence_model
+from django_seq.upsert import SequenceUpsert
+from django_seq.utils import (
+    get_model_options,
+    get_sequence_model,
+    hash_key,
+)
 
 
 __all__ = (
@@ -31,9 +63,18 @@ __all__ = (
     'Key',
     'SequenceKeyEvaluator',
     'SequenceField',
+    'SequenceQuerySetMixin',
+    'SequenceQuerySet',
+    'SequenceManager',
     'AbstractSequence',
     'BaseSequence',
     'Sequence',
+    'AbstractHashedSequence',
+    'BaseHashedSequence',
+    'BaseUUIDHashedSequence',
+    'AbstractStructuredSequence',
+    'BaseStructuredSequence',
+    'ReleasedValue',
 )
 
 
@@ -41,6 +82,8 @@ class AbstractSequence(models.Model):
 
     KEY_FIELD_NAME = 'key'
 
+    LOOKUP_FIELD_NAME = KEY_FIELD_NAME
+
     VALUE_FIELD_NAME = 'value'
 
     CREATED_AT_FIELD_NAME = 'created_at'
@@ -50,6 +93,66 @@ class AbstractSequence(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def get_database_alias(
+        cls,
+        using: Optional[str] = None,
+    ) -> str:
+        return using or settings.DATABASE or router.db_for_write(cls)
+
+    @classmethod
+    def get_lookup_value(
+        cls,
+        key: str,
+    ) -> Any:
+        return key
+
+    @classmethod
+    def get_lookup_field_names(cls) -> List[str]:
+        return [
+            cls.LOOKUP_FIELD_NAME,
+        ]
+
+    @classmethod
+    def get_lookup(
+        cls,
+        key: str,
+    ) -> Dict[str, Any]:
+        return {
+            cls.LOOKUP_FIELD_NAME: cls.get_lookup_value(key),
+        }
+
+    @classmethod
+    def get_update_fields(cls) -> List[str]:
+        return [
+            cls.VALUE_FIELD_NAME,
+            *(field.name for field in SequenceUpsert.get_touched_fields(cls)),
+        ]
+
+    @classmethod
+    def get_update_values(
+        cls,
+        value: int,
+    ) -> Dict[str, Any]:
+        values: Dict[str, Any] = {
+            field.name: timezone.now()
+            for field in SequenceUpsert.get_touched_fields(cls)
+        }
+        values[cls.VALUE_FIELD_NAME] = value
+        return values
+
+    @classmethod
+    def get_transaction(
+        cls,
+        using: Optional[str] = None,
+    ) -> ContextManager[Any]:
+        # Locking the sequence requires a transaction, which isn't opened by
+        # the caller if the sequences are stored in a separate database.
+        using = cls.get_database_alias(using)
+        if connections[using].in_atomic_block:
+            return contextlib.nullcontext()
+        return transaction.atomic(using=using)
+
     @classmethod
     def get_or_create(
         cls,
@@ -57,33 +160,47 @@ class AbstractSequence(models.Model):
         defaults: Optional[Dict[str, Any]] = None,
         select_for_update: bool = True,
         nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        event: Optional[AllocationEvent] = None,
+        using: Optional[str] = None,
     ) -> Tuple['AbstractSequence', bool]:
         defaults = defaults or {
             cls.VALUE_FIELD_NAME: 0,
         }
-        queryset: Union[
-            'models.Manager[AbstractSequence]',
-            'models.QuerySet[AbstractSequence]',
-        ] = cls.objects
-        if select_for_update:
-            queryset = queryset.select_for_update(nowait=nowait)
-        return queryset.get_or_create(
-            defaults=defaults,
-            **{
-                cls.KEY_FIELD_NAME: key,
-            },
-        )
+
+        def _get_or_create(nowait: bool) -> Tuple['AbstractSequence', bool]:
+            queryset: Union[
+                'models.Manager[AbstractSequence]',
+                'models.QuerySet[AbstractSequence]',
+            ] = cls.objects.db_manager(cls.get_database_alias(using))
+            if select_for_update:
+                queryset = queryset.select_for_update(nowait=nowait)
+            return queryset.get_or_create(
+                defaults={
+                    cls.KEY_FIELD_NAME: key,
+                    **defaults,
+                },
+                **cls.get_lookup(key),
+            )
+
+        retry_policy = retry_policy or settings.RETRY_POLICY
+        if select_for_update and nowait and retry_policy is not None:
+            return retry_policy.execute(
+                _get_or_create,
+                using=cls.get_database_alias(using),
+                event=event,
+            )
+        return _get_or_create(nowait)
 
     @classmethod
     def get_current_value(
         cls,
         key: str,
         default_value: int = 0,
+        using: Optional[str] = None,
     ) -> int:
-        sequence = cls.objects.filter(
-            **{
-                cls.KEY_FIELD_NAME: key,
-            },
+        sequence = cls.objects.db_manager(cls.get_database_alias(using)).filter(
+            **cls.get_lookup(key),
         ).first()
         return getattr(sequence, cls.VALUE_FIELD_NAME, default_value)
 
@@ -92,21 +209,107 @@ class AbstractSequence(models.Model):
         cls,
         key: str,
         nowait: bool = False,
+        increment: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+        using: Optional[str] = None,
     ) -> int:
-        sequence, is_created = cls.get_or_create(
+        with measure(cls, 'get_next_value', key, lambda: [cls.get_database_alias(using)]) as event:
+            if not nowait:
+                with event.measure_lock():
+                    value = SequenceUpsert.execute(cls, key, increment=increment, using=using)
+                if value is not None:
+                    event.mode = 'upsert'
+                    return value
+            event.mode = 'nowait' if nowait else 'select_for_update'
+            with cls.get_transaction(using):
+                with event.measure_lock():
+                    sequence, is_created = cls.get_or_create(
+                        key,
+                        defaults={
+                            cls.VALUE_FIELD_NAME: increment,
+                        },
+                        select_for_update=True,
+                        nowait=nowait,
+                        retry_policy=retry_policy,
+                        event=event,
+                        using=using,
+                    )
+                value = getattr(sequence, cls.VALUE_FIELD_NAME)
+                if not is_created:
+                    value = value + increment
+                    setattr(sequence, cls.VALUE_FIELD_NAME, value)
+                    sequence.save(
+                        using=cls.get_database_alias(using),
+                        update_fields=cls.get_update_fields(),
+                    )
+        return value
+
+    @classmethod
+    def get_next_values(
+        cls,
+        key: str,
+        count: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        using: Optional[str] = None,
+    ) -> range:
+        if count < 1:
+            raise ValueError(f'count must be a positive integer, not {count!r}')
+        last_value = cls.get_next_value(
             key,
-            defaults={
-                cls.VALUE_FIELD_NAME: 1,
-            },
-            select_for_update=True,
             nowait=nowait,
+            increment=count,
+            retry_policy=retry_policy,
+            using=using,
         )
-        value = getattr(sequence, cls.VALUE_FIELD_NAME)
-        if not is_created:
-            value = value + 1
-            setattr(sequence, cls.VALUE_FIELD_NAME, value)
-            sequence.save()
-        return value
+        return range(last_value - count + 1, last_value + 1)
+
+    @classmethod
+    def get_next_values_for_keys(
+        cls,
+        counts: Dict[str, int],
+        current_values: Optional[Dict[str, int]] = None,
+        using: Optional[str] = None,
+    ) -> Dict[str, range]:
+        current_values = current_values or {}
+        for key, count in counts.items():
+            if count < 1:
+                raise ValueError(f'count of {key!r} must be a positive integer, not {count!r}')
+            if key in current_values:
+                raise ValueError(f'{key!r} can not be both counted and set')
+        keys = sorted({*counts, *current_values})
+        if not keys:
+            return {}
+        with measure(
+            cls,
+            'get_next_values_for_keys',
+            ', '.join(keys),
+            lambda: [cls.get_database_alias(using)],
+        ) as event:
+            with event.measure_lock():
+                last_values = SequenceUpsert.execute_many(
+                    cls,
+                    counts,
+                    current_values=current_values,
+                    using=using,
+                )
+            if last_values is not None:
+                event.mode = 'upsert'
+            else:
+                # Keys are locked one by one, in the same order as the upsert.
+                event.mode = 'select_for_update'
+                last_values = {
+                    key: (
+                        cls.set_current_value(key, current_values[key], using=using)
+                        if key in current_values
+                        else cls.get_next_value(key, increment=counts[key], using=using)
+                    )
+                    for key in keys
+                }
+        return {
+            key: range(last_values[key] - counts.get(key, 1) + 1, last_values[key] + 1)
+            for key in keys
+        }
 
     @classmethod
     def set_current_value(
@@ -114,19 +317,124 @@ class AbstractSequence(models.Model):
         key: str,
         value: int,
         nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        using: Optional[str] = None,
     ) -> int:
-        sequence, is_created = cls.get_or_create(
-            key,
-            defaults={
-                cls.VALUE_FIELD_NAME: value,
+        with measure(cls, 'set_current_value', key, lambda: [cls.get_database_alias(using)]) as event:
+            event.mode = 'nowait' if nowait else 'select_for_update'
+            with cls.get_transaction(using):
+                with event.measure_lock():
+                    sequence, is_created = cls.get_or_create(
+                        key,
+                        defaults={
+                            cls.VALUE_FIELD_NAME: value,
+                        },
+                        select_for_update=True,
+                        nowait=nowait,
+                        retry_policy=retry_policy,
+                        event=event,
+                        using=using,
+                    )
+                if not is_created:
+                    setattr(sequence, cls.VALUE_FIELD_NAME, value)
+                    sequence.save(
+                        using=cls.get_database_alias(using),
+                        update_fields=cls.get_update_fields(),
+                    )
+        return value
+
+    @classmethod
+    def return_values(
+        cls,
+        key: str,
+        values: SequenceType[int],
+        using: Optional[str] = None,
+    ) -> int:
+        # Values can be returned only if they are the last values of the
+        # sequence, which is checked and updated in a single statement.
+        if not values or list(values) != list(range(values[0], values[-1] + 1)):
+            return 0
+        is_returned = cls.objects.db_manager(cls.get_database_alias(using)).filter(
+            **cls.get_lookup(key),
+            **{
+                cls.VALUE_FIELD_NAME: values[-1],
             },
-            select_for_update=True,
+        ).update(**cls.get_update_values(values[0] - 1))
+        return len(values) if is_returned else 0
+
+    @classmethod
+    async def aget_current_value(
+        cls,
+        key: str,
+        default_value: int = 0,
+        using: Optional[str] = None,
+    ) -> int:
+        sequence = await cls.objects.db_manager(cls.get_database_alias(using)).filter(
+            **cls.get_lookup(key),
+        ).afirst()
+        return getattr(sequence, cls.VALUE_FIELD_NAME, default_value)
+
+    @classmethod
+    async def aget_next_value(
+        cls,
+        key: str,
+        nowait: bool = False,
+        increment: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+        using: Optional[str] = None,
+    ) -> int:
+        # Incrementing the value needs a row lock which is held until the
+        # transaction ends, so the whole operation runs in a single hop.
+        get_next_value = transaction.atomic(
+            using=cls.get_database_alias(using),
+        )(cls.get_next_value)
+        return await sync_to_async(get_next_value)(
+            key,
             nowait=nowait,
+            increment=increment,
+            retry_policy=retry_policy,
+            using=using,
+        )
+
+    @classmethod
+    async def aget_next_values(
+        cls,
+        key: str,
+        count: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        using: Optional[str] = None,
+    ) -> range:
+        if count < 1:
+            raise ValueError(f'count must be a positive integer, not {count!r}')
+        last_value = await cls.aget_next_value(
+            key,
+            nowait=nowait,
+            increment=count,
+            retry_policy=retry_policy,
+            using=using,
+        )
+        return range(last_value - count + 1, last_value + 1)
+
+    @classmethod
+    async def aset_current_value(
+        cls,
+        key: str,
+        value: int,
+        nowait: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        using: Optional[str] = None,
+    ) -> int:
+        set_current_value = transaction.atomic(
+            using=cls.get_database_alias(using),
+        )(cls.set_current_value)
+        return await sync_to_async(set_current_value)(
+            key,
+            value,
+            nowait=nowait,
+            retry_policy=retry_policy,
+            using=using,
         )
-        if not is_created:
-            setattr(sequence, cls.VALUE_FIELD_NAME, value)
-            sequence.save()
-        return value
 
 
 class BaseSequence(
@@ -173,7 +481,6 @@ class BaseSequence(
         auto_now=True,
         blank=True,
         null=False,
-        db_index=True,
     )
 
     class Meta:
@@ -201,3 +508,363 @@ class Sequence(
 
     def __str__(self):
         return getattr(self, self.__class__.KEY_FIELD_NAME)
+
+
+class AbstractHashedSequence(AbstractSequence):
+
+    KEY_HASH_FIELD_NAME = 'key_hash'
+
+    LOOKUP_FIELD_NAME = KEY_HASH_FIELD_NAME
+
+    KEY_HASH_SIZE = 8
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def get_lookup_value(
+        cls,
+        key: str,
+    ) -> Any:
+        return hash_key(key, cls.KEY_HASH_SIZE)
+
+
+class BaseHashedSequence(
+    AbstractHashedSequence,
+    BaseSequence,
+    models.Model,
+):
+
+    key: TextField[
+        str,
+        str,
+    ] = models.TextField(
+        verbose_name=_('key'),
+        blank=False,
+        null=False,
+    )
+
+    key_hash: BigIntegerField[
+        int,
+        int,
+    ] = models.BigIntegerField(
+        verbose_name=_('key hash'),
+        blank=False,
+        null=False,
+        unique=True,
+        editable=False,
+    )
+
+    class Meta(BaseSequence.Meta):
+        abstract = True
+
+
+class BaseUUIDHashedSequence(
+    BaseHashedSequence,
+    models.Model,
+):
+
+    KEY_HASH_SIZE = 16
+
+    key_hash: UUIDField[
+        uuid.UUID,
+        uuid.UUID,
+    ] = models.UUIDField(  # type: ignore[assignment]
+        verbose_name=_('key hash'),
+        blank=False,
+        null=False,
+        unique=True,
+        editable=False,
+    )
+
+    class Meta(BaseHashedSequence.Meta):
+        abstract = True
+
+
+class AbstractStructuredSequence(AbstractSequence):
+
+    NAMESPACE_FIELD_NAME = 'namespace'
+
+    SCOPE_ID_FIELD_NAME = 'scope_id'
+
+    NAME_FIELD_NAME = 'name'
+
+    KEY_SEPARATOR = '.'
+
+    NO_SCOPE_ID = -1
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def get_lookup_field_names(cls) -> List[str]:
+        return [
+            cls.NAMESPACE_FIELD_NAME,
+            cls.SCOPE_ID_FIELD_NAME,
+            cls.NAME_FIELD_NAME,
+        ]
+
+    @classmethod
+    def get_lookup_value(
+        cls,
+        key: str,
+    ) -> Any:
+        # The first segment is the namespace, and the second one is the scope
+        # if it's an integer in its canonical form, so that the mapping
+        # is reversible. The remaining segments are the name.
+        namespace, *segments = key.split(cls.KEY_SEPARATOR)
+        scope_id = cls.NO_SCOPE_ID
+        if segments and re.fullmatch(r'0|[1-9][0-9]*', segments[0]):
+            scope_id = int(segments.pop(0))
+        name = cls.KEY_SEPARATOR.join(segments)
+        # Keys which don't join back from their columns, e.g. `invoices.`,
+        # would share the row of another key.
+        if cls.join_lookup_value(namespace, scope_id, name) != key:
+            raise ValueError(f'Key {key!r} can not be split into namespace, scope ID and name.')
+        for field in get_model_options(cls).fields:
+            value = {cls.NAMESPACE_FIELD_NAME: namespace, cls.NAME_FIELD_NAME: name}.get(field.name)
+            if value is not None and field.max_length is not None and len(value) > field.max_length:
+                raise ValueError(f'{field.name.capitalize()} of key {key!r} is longer than {field.max_length}.')
+        return namespace, scope_id, name
+
+    @classmethod
+    def join_lookup_value(
+        cls,
+        namespace: str,
+        scope_id: int,
+        name: str,
+    ) -> str:
+        segments = [namespace]
+        if scope_id != cls.NO_SCOPE_ID:
+            segments.append(str(scope_id))
+        if name:
+            segments.append(name)
+        return cls.KEY_SEPARATOR.join(segments)
+
+    @classmethod
+    def get_lookup(
+        cls,
+        key: str,
+    ) -> Dict[str, Any]:
+        return dict(
+            zip(
+                cls.get_lookup_field_names(),
+                cls.get_lookup_value(key),
+            ),
+        )
+
+    @classmethod
+    def get_scope_queryset(
+        cls,
+        namespace: str,
+        scope_id: Optional[int] = None,
+    ) -> 'models.QuerySet[AbstractSequence]':
+        queryset = cls.objects.db_manager(cls.get_database_alias()).filter(
+            **{
+                cls.NAMESPACE_FIELD_NAME: namespace,
+            },
+        )
+        if scope_id is not None:
+            queryset = queryset.filter(
+                **{
+                    cls.SCOPE_ID_FIELD_NAME: scope_id,
+                },
+            )
+        return queryset
+
+
+class BaseStructuredSequence(
+    AbstractStructuredSequence,
+    BaseSequence,
+    models.Model,
+):
+
+    key: TextField[
+        str,
+        str,
+    ] = models.TextField(
+        verbose_name=_('key'),
+        blank=False,
+        null=False,
+    )
+
+    namespace: CharField[
+        str,
+        str,
+    ] = models.CharField(
+        verbose_name=_('namespace'),
+        max_length=255,
+        blank=False,
+        null=False,
+        editable=False,
+    )
+
+    scope_id: BigIntegerField[
+        int,
+        int,
+    ] = models.BigIntegerField(
+        verbose_name=_('scope ID'),
+        blank=False,
+        null=False,
+        editable=False,
+    )
+
+    name: CharField[
+        str,
+        str,
+    ] = models.CharField(
+        verbose_name=_('name'),
+        max_length=255,
+        blank=True,
+        null=False,
+        editable=False,
+    )
+
+    class Meta(BaseSequence.Meta):
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    AbstractStructuredSequence.NAMESPACE_FIELD_NAME,
+                    AbstractStructuredSequence.SCOPE_ID_FIELD_NAME,
+                    AbstractStructuredSequence.NAME_FIELD_NAME,
+                ],
+                name='%(app_label)s_%(class)s_lookup',
+            ),
+        ]
+
+
+class ReleasedValue(models.Model):
+
+    KEY_FIELD_NAME = 'key'
+
+    VALUE_FIELD_NAME = 'value'
+
+    IS_POOLED_FIELD_NAME = 'is_pooled'
+
+    key: TextField[
+        str,
+        str,
+    ] = models.TextField(
+        verbose_name=_('key'),
+        blank=False,
+        null=False,
+    )
+
+    value: PositiveBigIntegerField[
+        int,
+        int,
+    ] = models.PositiveBigIntegerField(
+        verbose_name=_('value'),
+        blank=False,
+        null=False,
+    )
+
+    is_pooled: BooleanField[
+        bool,
+        bool,
+    ] = models.BooleanField(
+        verbose_name=_('is pooled'),
+        default=False,
+    )
+
+    class Meta:
+
+        verbose_name = _('released value')
+
+        verbose_name_plural = _('released values')
+
+        db_table = 'django_seq__released_values'
+
+        unique_together = (
+            ('key', 'value'),
+        )
+
+    def __str__(self):
+        return f'{getattr(self, self.__class__.KEY_FIELD_NAME)}: {getattr(self, self.__class__.VALUE_FIELD_NAME)}'
+
+    @classmethod
+    def get_database_alias(
+        cls,
+        using: Optional[str] = None,
+    ) -> str:
+        return using or settings.DATABASE or router.db_for_write(cls)
+
+    @classmethod
+    def release(
+        cls,
+        key: str,
+        value: int,
+        using: Optional[str] = None,
+    ) -> None:
+        cls.objects.db_manager(cls.get_database_alias(using)).bulk_create(
+            [
+                cls(
+                    **{
+                        cls.KEY_FIELD_NAME: key,
+                        cls.VALUE_FIELD_NAME: value,
+                    },
+                ),
+            ],
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def claim(
+        cls,
+        key: str,
+        using: Optional[str] = None,
+    ) -> Optional[int]:
+        values = cls.claim_many(key, 1, using=using)
+        return values[0] if values else None
+
+    @classmethod
+    def claim_many(
+        cls,
+        key: str,
+        count: int,
+        using: Optional[str] = None,
+    ) -> List[int]:
+        using = cls.get_database_alias(using)
+        queryset = cls.objects.db_manager(using).filter(
+            **{
+                cls.KEY_FIELD_NAME: key,
+            },
+        ).order_by(
+            cls.VALUE_FIELD_NAME,
+        )
+        features = connections[using].features
+        if features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        elif features.has_select_for_update:
+            queryset = queryset.select_for_update()
+        with transaction.atomic(using=using):
+            released_values = list(
+                queryset.values_list(
+                    'pk',
+                    cls.VALUE_FIELD_NAME,
+                )[:count],
+            )
+            if not released_values:
+                return []
+            if not features.has_select_for_update:
+                return cls.delete_claimed(released_values, using=using)
+            cls.objects.db_manager(using).filter(
+                pk__in=[pk for pk, _ in released_values],
+            ).delete()
+        return [value for _, value in released_values]
+
+    @classmethod
+    def delete_claimed(
+        cls,
+        released_values: List[Tuple[Any, int]],
+        using: Optional[str] = None,
+    ) -> List[int]:
+        # Without row locks, the concurrent claimers may read the same rows,
+        # so only the values whose rows are deleted by this claimer are kept.
+        manager = cls.objects.db_manager(cls.get_database_alias(using))
+        return [
+            value
+            for pk, value in released_values
+            if manager.filter(pk=pk).delete()[0]
+        ]
@@ -0,0 +1,192 @@
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+)
+
+from django.apps.registry import Apps
+from django.db import migrations
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.state import ProjectState
+from django.db.models import (
+    DateTimeField,
+    UUIDField,
+)
+
+from django_seq.models import (
+    AbstractHashedSequence,
+    AbstractSequence,
+    AbstractStructuredSequence,
+)
+from django_seq.utils import (
+    get_model_options,
+    hash_key,
+)
+
+
+__all__ = (
+    'AlterSwappableField',
+    'CopySequences',
+)
+
+
+class AlterSwappableField(migrations.AlterField):
+
+    # The initial migration of a swapped sequence model replaces the initial
+    # migration of the default model, so the default model doesn't exist in
+    # the state, and the operation does nothing.
+
+    def is_applicable(
+        self,
+        app_label: str,
+        state: ProjectState,
+    ) -> bool:
+        return (app_label, self.model_name_lower) in state.models
+
+    def state_forwards(
+        self,
+        app_label: str,
+        state: ProjectState,
+    ) -> None:
+        if self.is_applicable(app_label, state):
+            super(AlterSwappableField, self).state_forwards(app_label, state)
+
+    def database_forwards(
+        self,
+        app_label: str,
+        schema_editor: BaseDatabaseSchemaEditor,
+        from_state: ProjectState,
+        to_state: ProjectState,
+    ) -> None:
+        if self.is_applicable(app_label, from_state):
+            super(AlterSwappableField, self).database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(
+        self,
+        app_label: str,
+        schema_editor: BaseDatabaseSchemaEditor,
+        from_state: ProjectState,
+        to_state: ProjectState,
+    ) -> None:
+        if self.is_applicable(app_label, from_state):
+            super(AlterSwappableField, self).database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class CopySequences(migrations.RunPython):
+
+    from_model: str
+
+    to_model: str
+
+    batch_size: int
+
+    separator: str
+
+    def __init__(
+        self,
+        from_model: str,
+        to_model: str,
+        batch_size: int = 1000,
+        separator: str = '.',
+        **kwargs: Any,
+    ) -> None:
+        self.from_model = from_model
+        self.to_model = to_model
+        self.batch_size = batch_size
+        self.separator = separator
+        super(CopySequences, self).__init__(
+            self.copy,
+            migrations.RunPython.noop,
+            **kwargs,
+        )
+
+    def deconstruct(self) -> Tuple[str, List[Any], Dict[str, Any]]:
+        return (
+            self.__class__.__name__,
+            [],
+            {
+                'from_model': self.from_model,
+                'to_model': self.to_model,
+                'batch_size': self.batch_size,
+                'separator': self.separator,
+            },
+        )
+
+    def describe(self) -> str:
+        return f'Copy sequences from {self.from_model} to {self.to_model}'
+
+    def join_key(
+        self,
+        key: str,
+    ) -> str:
+        # The fields join the keys of structured sequence models by the
+        # separator of the model instead of their own separator.
+        segments = key.split(self.separator)
+        key_separator = AbstractStructuredSequence.KEY_SEPARATOR
+        if key_separator != self.separator and any(key_separator in segment for segment in segments):
+            raise ValueError(f'Key {key!r} can not be joined by {key_separator!r}.')
+        return key_separator.join(segments)
+
+    def copy(
+        self,
+        apps: Apps,
+        schema_editor: BaseDatabaseSchemaEditor,
+    ) -> None:
+        # Historical models don't have the methods of the sequence models, so
+        # the field names and the key hash are resolved here.
+        from_model = apps.get_model(self.from_model)
+        to_model = apps.get_model(self.to_model)
+        using = schema_editor.connection.alias
+
+        field_names = [
+            AbstractSequence.KEY_FIELD_NAME,
+            AbstractSequence.VALUE_FIELD_NAME,
+            AbstractSequence.CREATED_AT_FIELD_NAME,
+            AbstractSequence.UPDATED_AT_FIELD_NAME,
+        ]
+
+        to_model_options = get_model_options(to_model)
+        to_field_names = {field.name for field in to_model_options.concrete_fields}
+
+        # The timestamps are copied as they are, which is safe to do since
+        # the historical models are not shared with the application.
+        for field in to_model_options.concrete_fields:
+            if isinstance(field, DateTimeField):
+                field.auto_now = field.auto_now_add = False
+
+        key_hash_size = 0
+        if AbstractHashedSequence.KEY_HASH_FIELD_NAME in to_field_names:
+            key_hash_field = to_model_options.get_field(AbstractHashedSequence.KEY_HASH_FIELD_NAME)
+            key_hash_size = 16 if isinstance(key_hash_field, UUIDField) else 8
+
+        structured_field_names = AbstractStructuredSequence.get_lookup_field_names()
+        is_structured = set(structured_field_names) <= to_field_names
+
+        rows = from_model._default_manager.using(using).order_by('pk').values_list(*field_names)
+
+        batch: List[Any] = []
+        for row in rows.iterator(chunk_size=self.batch_size):
+            values = dict(zip(field_names, row))
+            if is_structured:
+                values[AbstractSequence.KEY_FIELD_NAME] = self.join_key(values[AbstractSequence.KEY_FIELD_NAME])
+            if key_hash_size:
+                values[AbstractHashedSequence.KEY_HASH_FIELD_NAME] = hash_key(
+                    values[AbstractSequence.KEY_FIELD_NAME],
+                    key_hash_size,
+                )
+            if is_structured:
+                values.update(
+                    zip(
+                        structured_field_names,
+                        AbstractStructuredSequence.get_lookup_value(
+                            values[AbstractSequence.KEY_FIELD_NAME],
+                        ),
+                    ),
+                )
+            batch.append(to_model(**values))
+            if len(batch) >= self.batch_size:
+                to_model._default_manager.using(using).bulk_create(batch)
+                batch = []
+        if batch:
+            to_model._default_manager.using(using).bulk_create(batch)
@@ -0,0 +1,141 @@
+import contextlib
+import random
+import time
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Optional,
+    TypeVar,
+)
+
+from django.db import (
+    DatabaseError,
+    connections,
+    transaction,
+)
+from django.utils.deconstruct import deconstructible
+
+from django_seq.instrumentation import AllocationEvent
+
+
+__all__ = (
+    'RetryPolicy',
+)
+
+
+T = TypeVar('T')
+
+
+# SQLSTATE of PostgreSQL `lock_not_available`.
+POSTGRESQL_LOCK_NOT_AVAILABLE = '55P03'
+
+# `ER_LOCK_NOWAIT` and `ER_LOCK_WAIT_TIMEOUT` of MySQL.
+MYSQL_LOCK_NOT_AVAILABLE = (3572, 1205)
+
+# `ORA-00054: resource busy and acquire with NOWAIT specified`.
+ORACLE_LOCK_NOT_AVAILABLE = 54
+
+# `SQLITE_BUSY` and `SQLITE_LOCKED`.
+SQLITE_LOCK_NOT_AVAILABLE = (5, 6)
+
+
+@deconstructible
+class RetryPolicy:
+
+    max_attempts: int
+
+    base_delay: float
+
+    max_delay: float
+
+    wait: bool
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.01,
+        max_delay: float = 0.5,
+        wait: bool = False,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError(f'max_attempts must be a positive integer, not {max_attempts!r}')
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.wait = wait
+
+    def __eq__(
+        self,
+        other: object,
+    ) -> bool:
+        if not isinstance(other, RetryPolicy):
+            return NotImplemented
+        return self.deconstruct() == other.deconstruct()  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        return hash(repr(self.deconstruct()))  # type: ignore[attr-defined]
+
+    def get_delay(
+        self,
+        attempt: int,
+    ) -> float:
+        # Full jitter spreads the retries of the writers that failed at the
+        # same time, so they don't collide again.
+        return random.uniform(
+            0,
+            min(self.max_delay, self.base_delay * 2 ** (attempt - 1)),
+        )
+
+    def get_savepoint(
+        self,
+        using: str,
+    ) -> ContextManager[Any]:
+        # A failed statement aborts the whole transaction on PostgreSQL, so
+        # every attempt is isolated in a savepoint. Outside of a transaction,
+        # a savepoint would release the lock as soon as it's acquired.
+        if connections[using].in_atomic_block:
+            return transaction.atomic(using=using)
+        return contextlib.nullcontext()
+
+    def is_lock_not_available(
+        self,
+        error: DatabaseError,
+        using: str,
+    ) -> bool:
+        # Only the errors which mean that the lock was not available are
+        # retried, the other errors are raised immediately.
+        vendor = connections[using].vendor
+        cause = error.__cause__ or error
+        if vendor == 'postgresql':
+            sqlstate = getattr(cause, 'sqlstate', None) or getattr(cause, 'pgcode', None)
+            return sqlstate == POSTGRESQL_LOCK_NOT_AVAILABLE
+        if vendor == 'mysql':
+            return bool(cause.args) and cause.args[0] in MYSQL_LOCK_NOT_AVAILABLE
+        if vendor == 'oracle':
+            return bool(cause.args) and getattr(cause.args[0], 'code', None) == ORACLE_LOCK_NOT_AVAILABLE
+        if vendor == 'sqlite':
+            error_code = getattr(cause, 'sqlite_errorcode', None)
+            return error_code is not None and error_code & 0xFF in SQLITE_LOCK_NOT_AVAILABLE
+        return False
+
+    def execute(
+        self,
+        function: Callable[[bool], T],
+        using: str,
+        event: Optional[AllocationEvent] = None,
+    ) -> T:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with self.get_savepoint(using):
+                    return function(True)
+            except DatabaseError as error:
+                if not self.is_lock_not_available(error, using):
+                    raise
+                if attempt == self.max_attempts and not self.wait:
+                    raise
+            if event is not None:
+                event.retries += 1
+            if attempt < self.max_attempts:
+                time.sleep(self.get_delay(attempt))
+        return function(False)
@@ -0,0 +1,65 @@
+from typing import (
+    Any,
+    Optional,
+    Type,
+)
+
+from django.db.models import Model
+
+from django_seq.conf import settings
+from django_seq.utils import get_model_options
+
+
+__all__ = (
+    'SequenceRouter',
+)
+
+
+class SequenceRouter:
+
+    def is_sequence_table(
+        self,
+        app_label: str,
+        model_name: Optional[str] = None,
+    ) -> bool:
+        if app_label == 'django_seq':
+            return True
+        if model_name is None:
+            return False
+        return f'{app_label}.{model_name}'.lower() == settings.SEQUENCE_MODEL.lower()
+
+    def get_database_alias(
+        self,
+        model: Type[Model],
+    ) -> Optional[str]:
+        model_options = get_model_options(model)
+        if not self.is_sequence_table(model_options.app_label, model_options.model_name):
+            return None
+        return settings.DATABASE
+
+    def db_for_read(
+        self,
+        model: Type[Model],
+        **hints: Any,
+    ) -> Optional[str]:
+        return self.get_database_alias(model)
+
+    def db_for_write(
+        self,
+        model: Type[Model],
+        **hints: Any,
+    ) -> Optional[str]:
+        return self.get_database_alias(model)
+
+    def allow_migrate(
+        self,
+        db: str,
+        app_label: str,
+        model_name: Optional[str] = None,
+        **hints: Any,
+    ) -> Optional[bool]:
+        if settings.DATABASE is None:
+            return None
+        if not self.is_sequence_table(app_label, model_name):
+            return None
+        return db == settings.DATABASE
@@ -1,13 +1,22 @@
+import functools
+import logging
 from typing import (
+    Any,
     Callable,
+    Dict,
+    List,
     Optional,
     Sequence,
+    Tuple,
+    Type,
     Union,
     cast,
 )
 
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models import (
     F,
+    ForeignKey,
     Model,
 )
 from django.db.models.constants import LOOKUP_SEP
@@ -16,6 +25,8 @@ from django.db.models.constants import LOOKUP_SEP
 __all__ = (
     'Segment',
     'Key',
+    'CompiledFPath',
+    'CompiledKey',
     'SequenceKeyEvaluator',
 )
 
@@ -35,8 +46,185 @@ Key = Union[
 ]
 
 
+logger = logging.getLogger(__name__)
+
+
+SegmentEvaluator = Callable[[Model], str]
+
+
+class CompiledFPath:
+
+    f_name: str
+
+    steps: List[Tuple[str, Optional[ForeignKey]]]
+
+    def __init__(
+        self,
+        f_name: str,
+        model: Optional[Type[Model]] = None,
+    ) -> None:
+        self.f_name = f_name
+        self.steps = []
+        f_path = f_name.split(LOOKUP_SEP)
+        current_model = model
+        index = 0
+        while index < len(f_path):
+            name = f_path[index]
+            field = self.get_foreign_key(current_model, name)
+            if field is None:
+                self.steps.append((name, None))
+                current_model = None
+                index += 1
+                continue
+            related_model = cast(Type[Model], field.related_model)
+            next_name = f_path[index + 1] if index + 1 < len(f_path) else None
+            is_pk_lookup = (
+                next_name is None
+                or (
+                    index + 2 == len(f_path)
+                    and next_name in ('pk', related_model._meta.pk.name)  # noqa
+                )
+            )
+            if is_pk_lookup and field.target_field.primary_key:
+                # The value of the foreign key column is the primary key of
+                # the related object, so it's read without fetching the object.
+                self.steps.append((field.attname, None))
+                break
+            self.steps.append((name, field))
+            current_model = related_model
+            index += 1
+
+    def get_foreign_key(
+        self,
+        model: Optional[Type[Model]],
+        name: str,
+    ) -> Optional[ForeignKey]:
+        if model is None:
+            return None
+        try:
+            field = model._meta.get_field(name)  # noqa
+        except FieldDoesNotExist:
+            return None
+        if not isinstance(field, ForeignKey):
+            return None
+        return field
+
+    def __call__(
+        self,
+        instance: Model,
+    ) -> Any:
+        acc: Any = instance
+        for name, field in self.steps:
+            if field is not None and acc is not None and not field.is_cached(acc):
+                logger.debug(
+                    'Evaluating F(%r) on %r fetches %s from the database.',
+                    self.f_name,
+                    instance,
+                    field,
+                )
+            acc = getattr(acc, name)
+        if isinstance(acc, Model):
+            acc = acc.pk
+        return acc
+
+
+class CompiledKey:
+
+    path: Optional[Key]
+
+    separator: str
+
+    model: Optional[Type[Model]]
+
+    segment_evaluators: Optional[List[SegmentEvaluator]]
+
+    f_paths: List[CompiledFPath]
+
+    static_value: Optional[str]
+
+    def __init__(
+        self,
+        path: Optional[Key],
+        separator: str = '.',
+        model: Optional[Type[Model]] = None,
+    ) -> None:
+        self.path = path
+        self.separator = separator
+        self.model = model
+        self.segment_evaluators = None
+        self.f_paths = []
+        self.static_value = None
+        if path is None or callable(path):
+            return
+        segments = cast(
+            Sequence[Segment],
+            path if isinstance(path, (tuple, list)) else [path],
+        )
+        self.segment_evaluators = []
+        for segment in segments:
+            if isinstance(segment, F):
+                f_path = CompiledFPath(SequenceKeyEvaluator.get_f_name(segment), model=model)
+                self.f_paths.append(f_path)
+                self.segment_evaluators.append(
+                    functools.partial(SequenceKeyEvaluator.evaluate_f_path, f_path=f_path),
+                )
+            else:
+                self.segment_evaluators.append(
+                    SequenceKeyEvaluator.compile_segment(segment),
+                )
+        if all(not callable(segment) and not isinstance(segment, F) for segment in segments):
+            self.static_value = separator.join(str(segment) for segment in segments)
+
+    def evaluate(
+        self,
+        instance: Model,
+    ) -> Optional[str]:
+        if self.static_value is not None:
+            return self.static_value
+        if self.segment_evaluators is None:
+            return SequenceKeyEvaluator.evaluate(
+                instance,
+                self.path,
+                separator=self.separator,
+            )
+        return self.separator.join(
+            evaluate_segment(instance)
+            for evaluate_segment in self.segment_evaluators
+        )
+
+    def get_partition_lookups(
+        self,
+        instance: Model,
+    ) -> Dict[str, Any]:
+        return {
+            f_path.f_name: f_path(instance)
+            for f_path in self.f_paths
+        }
+
+
 class SequenceKeyEvaluator:
 
+    @classmethod
+    def compile(
+        cls,
+        path: Optional[Key],
+        separator: str = '.',
+        model: Optional[Type[Model]] = None,
+    ) -> CompiledKey:
+        return CompiledKey(path, separator=separator, model=model)
+
+    @classmethod
+    def compile_segment(
+        cls,
+        segment: Segment,
+    ) -> SegmentEvaluator:
+        if isinstance(segment, F):
+            return functools.partial(cls.evaluate_f, segment=segment)
+        if callable(segment):
+            return functools.partial(cls.evaluate_segment, segment=segment)
+        value = str(segment)
+        return lambda instance: value
+
     @classmethod
     def evaluate(
         cls,
@@ -77,10 +265,42 @@ class SequenceKeyEvaluator:
         instance: Model,
         segment: F,
     ) -> str:
-        f_name_split = segment.name.split(LOOKUP_SEP)
-        acc = instance
-        for f_name in f_name_split:
-            acc = getattr(acc, f_name)
-        if isinstance(acc, Model):
-            acc = acc.pk
-        return str(acc)
+        return str(cls.resolve_f(instance, segment))
+
+    @classmethod
+    def evaluate_f_path(
+        cls,
+        instance: Model,
+        f_path: CompiledFPath,
+    ) -> str:
+        return str(f_path(instance))
+
+    @classmethod
+    def get_f_name(
+        cls,
+        segment: F,
+    ) -> str:
+        return segment.name  # type: ignore[attr-defined]
+
+    @classmethod
+    def resolve_f(
+        cls,
+        instance: Model,
+        segment: F,
+    ) -> Any:
+        f_path = CompiledFPath(
+            cls.get_f_name(segment),
+            model=instance.__class__,
+        )
+        return f_path(instance)
+
+    @classmethod
+    def get_partition_lookups(
+        cls,
+        instance: Model,
+        path: Optional[Key],
+    ) -> Dict[str, Any]:
+        return cls.compile(
+            path,
+            model=instance.__class__,
+        ).get_partition_lookups(instance)
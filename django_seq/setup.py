@@ -15,5 +15,17 @@ def setup(
         return
     from django_seq.conf import settings
     from django_seq.connector import Connector
+    from django_seq.globals import (
+        block_allocator,
+        registry,
+    )
+    from django_seq.utils import get_sequence_model
+    # Blocks are leased by the previous settings, e.g. from another
+    # sequence model, so they are returned before the settings are reloaded.
+    block_allocator.close()
     settings.reload()
+    get_sequence_model.cache_clear()
+    # The keys are compiled by the separator of the sequence model.
+    for _, _, field in registry.model_sequence_field_pairs:
+        field.compiled_keys.clear()
     Connector.handle_registry()
@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+
+__all__ = (
+    'allocation_measured',
+)
+
+
+allocation_measured = Signal()
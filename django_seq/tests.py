@@ -3,19 +3,799 @@ from concurrent.futures import (
     ThreadPoolExecutor,
 )
 from contextlib import ExitStack
+from io import StringIO
 import multiprocessing
-from typing import List
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+from typing import (
+    Any,
+    List,
+)
 
 from django import db
-from django.db import transaction
-from django.test import TransactionTestCase
+from django.contrib import admin
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.db import (
+    DatabaseError,
+    NotSupportedError,
+    OperationalError,
+    connection,
+    connections,
+    transaction,
+)
+from django.db.models import (
+    F,
+    Model,
+)
+from django.core.management import call_command
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
 
+from django_seq.admin import SequenceAdmin
+from django_seq.allocation import BlockAllocator
+from django_seq.backends import (
+    AutonomousSequenceBackend,
+    CacheSequenceBackend,
+    NativeSequenceBackend,
+    PooledSequenceBackend,
+    SequenceBackend,
+    SharedMemorySequenceBackend,
+    StripedSequenceBackend,
+)
+from django_seq.backends.shared import SLOT
+from django_seq.instrumentation import (
+    AllocationEvent,
+    PrometheusCollector,
+    measure,
+)
+from django_seq.models import (
+    ReleasedValue,
+    SequenceField,
+)
+from django_seq.retry import RetryPolicy
+from django_seq.routers import SequenceRouter
+from django_seq.segmentation import (
+    Segment,
+    SequenceKeyEvaluator,
+)
+from django_seq.signals import allocation_measured
+from django_seq.upsert import SequenceUpsert
 from django_seq.utils import get_sequence_model
 
 
 Sequence = get_sequence_model()
 
 
+class SequenceTestCase(TestCase):
+
+    def test_get_next_value(self) -> None:
+        self.assertEqual(Sequence.get_next_value('repositories.1.issues'), 1)
+        self.assertEqual(Sequence.get_next_value('repositories.1.issues'), 2)
+        self.assertEqual(Sequence.get_next_value('repositories.2.issues'), 1)
+        self.assertEqual(Sequence.get_current_value('repositories.1.issues'), 2)
+        self.assertEqual(Sequence.get_current_value('repositories.2.issues'), 1)
+
+    def test_get_next_value_with_upsert(self) -> None:
+        connection = SequenceUpsert.get_connection(Sequence)
+        if not SequenceUpsert.is_supported(Sequence, connection):
+            self.skipTest(f'Upserts are not supported on {connection.vendor}.')
+
+        Sequence.get_next_value('repositories.1.issues')
+        sequence = Sequence.objects.get(key='repositories.1.issues')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(Sequence.get_next_value('repositories.1.issues'), 2)
+
+        updated_at = getattr(sequence, Sequence.UPDATED_AT_FIELD_NAME)
+        sequence.refresh_from_db()
+        self.assertEqual(getattr(sequence, Sequence.VALUE_FIELD_NAME), 2)
+        self.assertGreaterEqual(getattr(sequence, Sequence.UPDATED_AT_FIELD_NAME), updated_at)
+
+    def test_get_next_value_with_nowait(self) -> None:
+        with transaction.atomic():
+            self.assertEqual(Sequence.get_next_value('repositories.1.issues', nowait=True), 1)
+            self.assertEqual(Sequence.get_next_value('repositories.1.issues'), 2)
+            self.assertEqual(Sequence.get_next_value('repositories.1.issues', nowait=True), 3)
+
+    def test_get_next_value_updates_only_value(self) -> None:
+        Sequence.get_next_value('repositories.1.issues', nowait=True)
+
+        columns = [
+            SequenceUpsert.quote_column(SequenceUpsert.get_field(Sequence, field_name), connection)
+            for field_name in [
+                Sequence.KEY_FIELD_NAME,
+                Sequence.VALUE_FIELD_NAME,
+                Sequence.CREATED_AT_FIELD_NAME,
+                Sequence.UPDATED_AT_FIELD_NAME,
+            ]
+        ]
+
+        for update_timestamps in [True, False]:
+            with override_settings(DJANGO_SEQ_UPDATE_TIMESTAMPS=update_timestamps):
+                with CaptureQueriesContext(connection) as context:
+                    Sequence.get_next_value('repositories.1.issues', nowait=True)
+
+            update_sql = next(
+                query['sql']
+                for query in context.captured_queries
+                if query['sql'].startswith('UPDATE')
+            )
+            set_clause = update_sql.split(' SET ')[1].split(' WHERE ')[0]
+            self.assertNotIn(columns[0], set_clause)
+            self.assertIn(columns[1], set_clause)
+            self.assertNotIn(columns[2], set_clause)
+            self.assertEqual(columns[3] in set_clause, update_timestamps)
+
+        self.assertEqual(Sequence.get_current_value('repositories.1.issues'), 3)
+
+    def test_get_next_values(self) -> None:
+        self.assertEqual(Sequence.get_next_values('repositories.1.issues', 3), range(1, 4))
+        self.assertEqual(Sequence.get_next_values('repositories.1.issues', 2), range(4, 6))
+        self.assertEqual(Sequence.get_next_value('repositories.1.issues'), 6)
+        self.assertEqual(Sequence.get_next_values('repositories.1.issues', 1, nowait=True), range(7, 8))
+        self.assertEqual(Sequence.get_current_value('repositories.1.issues'), 7)
+
+        with self.assertRaises(ValueError):
+            Sequence.get_next_values('repositories.1.issues', 0)
+
+    def test_get_next_values_for_keys(self) -> None:
+        Sequence.set_current_value('repositories.2.issues', 10)
+        self.assertEqual(
+            Sequence.get_next_values_for_keys({
+                'repositories.2.issues': 1,
+                'repositories.1.issues': 3,
+            }),
+            {
+                'repositories.1.issues': range(1, 4),
+                'repositories.2.issues': range(11, 12),
+            },
+        )
+        self.assertEqual(Sequence.get_current_value('repositories.1.issues'), 3)
+        self.assertEqual(Sequence.get_current_value('repositories.2.issues'), 11)
+        self.assertEqual(Sequence.get_next_values_for_keys({}), {})
+
+        self.assertEqual(
+            Sequence.get_next_values_for_keys(
+                {'repositories.1.issues': 2},
+                current_values={'repositories.2.issues': 5, 'repositories.3.issues': 7},
+            ),
+            {
+                'repositories.1.issues': range(4, 6),
+                'repositories.2.issues': range(5, 6),
+                'repositories.3.issues': range(7, 8),
+            },
+        )
+        self.assertEqual(Sequence.get_current_value('repositories.2.issues'), 5)
+        self.assertEqual(Sequence.get_current_value('repositories.3.issues'), 7)
+
+        with self.assertRaises(ValueError):
+            Sequence.get_next_values_for_keys({'repositories.1.issues': 0})
+
+        with self.assertRaises(ValueError):
+            Sequence.get_next_values_for_keys(
+                {'repositories.1.issues': 1},
+                current_values={'repositories.1.issues': 1},
+            )
+
+    async def test_aget_next_value(self) -> None:
+        self.assertEqual(await Sequence.aget_current_value('repositories.1.issues'), 0)
+        self.assertEqual(await Sequence.aget_next_value('repositories.1.issues'), 1)
+        self.assertEqual(await Sequence.aget_next_value('repositories.1.issues', nowait=True), 2)
+        self.assertEqual(await Sequence.aget_next_values('repositories.1.issues', 3), range(3, 6))
+        self.assertEqual(await Sequence.aset_current_value('repositories.1.issues', 10), 10)
+        self.assertEqual(await Sequence.aset_current_value('repositories.2.issues', 20, nowait=True), 20)
+        self.assertEqual(await Sequence.aget_current_value('repositories.1.issues'), 10)
+        self.assertEqual(await Sequence.aget_current_value('repositories.2.issues'), 20)
+        self.assertEqual(await Sequence.aget_next_value('repositories.1.issues'), 11)
+
+    async def test_aset_current_value_is_measured(self) -> None:
+        events: List[AllocationEvent] = []
+
+        def _receive(event: AllocationEvent, **kwargs: Any) -> None:
+            events.append(event)
+
+        allocation_measured.connect(_receive, sender=Sequence)
+        self.addCleanup(allocation_measured.disconnect, _receive, sender=Sequence)
+
+        self.assertEqual(await Sequence.aset_current_value('repositories.1.issues', 10, nowait=True), 10)
+        self.assertEqual(
+            [(event.operation, event.key, event.mode) for event in events],
+            [('set_current_value', 'repositories.1.issues', 'nowait')],
+        )
+
+    def test_aliases_are_resolved_for_listeners(self) -> None:
+        get_aliases = mock.Mock(return_value=['default'])
+
+        with measure(Sequence, 'get_next_value', 'repositories.1.issues', get_aliases):
+            pass
+        get_aliases.assert_not_called()
+
+        def _receive(event: AllocationEvent, **kwargs: Any) -> None:
+            pass
+
+        allocation_measured.connect(_receive, sender=Sequence)
+        self.addCleanup(allocation_measured.disconnect, _receive, sender=Sequence)
+
+        with measure(Sequence, 'get_next_value', 'repositories.1.issues', get_aliases):
+            pass
+        get_aliases.assert_called_once_with()
+
+    def test_allocation_measured(self) -> None:
+        events: List[AllocationEvent] = []
+
+        def _receive(event: AllocationEvent, **kwargs: Any) -> None:
+            events.append(event)
+
+        allocation_measured.connect(_receive, sender=Sequence)
+        self.addCleanup(allocation_measured.disconnect, _receive, sender=Sequence)
+
+        collector = PrometheusCollector()
+        collector.connect()
+        self.addCleanup(collector.disconnect)
+
+        Sequence.get_next_value('repositories.1.issues')
+        Sequence.set_current_value('repositories.1.issues', 10)
+
+        self.assertEqual(
+            [(event.operation, event.key) for event in events],
+            [
+                ('get_next_value', 'repositories.1.issues'),
+                ('set_current_value', 'repositories.1.issues'),
+            ],
+        )
+        self.assertIn(events[0].mode, ('upsert', 'select_for_update'))
+        self.assertGreaterEqual(events[0].round_trips, 1)
+        self.assertGreaterEqual(events[0].duration, events[0].lock_duration)
+
+        metrics = collector.render()
+        self.assertIn(
+            'django_seq_allocation_duration_seconds_count{operation="set_current_value",mode="select_for_update"} 1',
+            metrics,
+        )
+        self.assertIn(
+            f'django_seq_round_trips_total{{operation="get_next_value",mode="{events[0].mode}"}} '
+            f'{events[0].round_trips}',
+            metrics,
+        )
+
+    def test_get_sequence_model(self) -> None:
+        self.assertIs(get_sequence_model(), Sequence)
+        with self.settings(DJANGO_SEQ_SEQUENCE_MODEL='django_seq.ReleasedValue'):
+            self.assertIs(get_sequence_model(), ReleasedValue)
+        self.assertIs(get_sequence_model(), Sequence)
+
+    def test_compiled_key(self) -> None:
+        sequence = Sequence(key='items', value=3)
+
+        compiled_key = SequenceKeyEvaluator.compile(['items', 1])
+        self.assertEqual(compiled_key.static_value, 'items.1')
+        self.assertEqual(compiled_key.evaluate(sequence), 'items.1')
+
+        compiled_key = SequenceKeyEvaluator.compile(
+            [F('key'), F('value'), lambda instance: 'values'],
+            separator=':',
+        )
+        self.assertIsNone(compiled_key.static_value)
+        self.assertEqual(compiled_key.evaluate(sequence), 'items:3:values')
+        self.assertEqual(compiled_key.get_partition_lookups(sequence), {'key': 'items', 'value': 3})
+
+        def _key(instance: Model) -> List[Segment]:
+            return ['items', F('value')]
+
+        compiled_key = SequenceKeyEvaluator.compile(_key)
+        self.assertEqual(compiled_key.evaluate(sequence), 'items.3')
+        self.assertEqual(compiled_key.get_partition_lookups(sequence), {})
+
+    def test_block_allocator(self) -> None:
+        block_allocator = BlockAllocator()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(block_allocator.get_next_value(Sequence, 'items', 4), 1)
+        self.assertEqual(Sequence.get_current_value('items'), 4)
+
+        with self.assertNumQueries(0):
+            for value in range(2, 5):
+                self.assertEqual(block_allocator.get_next_value(Sequence, 'items', 4), value)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(block_allocator.get_next_value(Sequence, 'items', 4), 5)
+        self.assertEqual(Sequence.get_current_value('items'), 8)
+
+    def test_block_allocator_discards_rolled_back_blocks(self) -> None:
+        block_allocator = BlockAllocator()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.assertEqual(block_allocator.get_next_value(Sequence, 'items', 4), 1)
+                raise RuntimeError()
+        self.assertEqual(Sequence.get_current_value('items'), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(block_allocator.get_next_value(Sequence, 'items', 4), 1)
+
+    def test_block_allocator_expires_leases(self) -> None:
+        block_allocator = BlockAllocator(ttl=60)
+
+        with mock.patch('django_seq.allocation.time.monotonic', return_value=0):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(block_allocator.get_next_value(Sequence, 'items', 4), 1)
+            self.assertEqual(block_allocator.get_next_value(Sequence, 'items', 4), 2)
+
+        with mock.patch('django_seq.allocation.time.monotonic', return_value=60):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(block_allocator.get_next_value(Sequence, 'items', 4), 5)
+
+    def test_block_allocator_evicts_least_recently_used_keys(self) -> None:
+        block_allocator = BlockAllocator(max_keys=2)
+
+        for key in ['items.1', 'items.2', 'items.3']:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(block_allocator.get_next_value(Sequence, key, 4), 1)
+            if key == 'items.2':
+                self.assertEqual(block_allocator.get_next_value(Sequence, 'items.1', 4), 2)
+
+        self.assertEqual(
+            [key for _, key in block_allocator.blocks],
+            ['items.1', 'items.3'],
+        )
+
+    def test_block_allocator_returns_leases(self) -> None:
+        block_allocator = BlockAllocator()
+
+        for key in ['items.1', 'items.2']:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(block_allocator.get_next_value(Sequence, key, 4), 1)
+        self.assertEqual(block_allocator.get_next_value(Sequence, 'items.1', 4), 2)
+        self.assertEqual(Sequence.get_next_value('items.2'), 5)
+
+        self.assertEqual(block_allocator.close(), 2)
+        self.assertEqual(block_allocator.blocks, {})
+        self.assertEqual(Sequence.get_current_value('items.1'), 2)
+        self.assertEqual(Sequence.get_current_value('items.2'), 5)
+
+    def test_block_allocator_returns_leases_on_setting_changed(self) -> None:
+        from django_seq.globals import block_allocator
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(block_allocator.get_next_value(Sequence, 'items', 4), 1)
+
+        with override_settings(DJANGO_SEQ_BLOCK_SIZE=4):
+            self.assertEqual(Sequence.get_current_value('items'), 1)
+            self.assertEqual(block_allocator.blocks, {})
+
+
+class SequenceFieldTestCase(TestCase):
+
+    def test_deconstruct(self) -> None:
+        field: SequenceField[int, int] = SequenceField(key=['events'])
+        field.set_attributes_from_name('number')
+        _, path, _, kwargs = field.deconstruct()
+        self.assertEqual(path, 'django_seq.models.SequenceField')
+        self.assertEqual(kwargs, {'key': ['events'], 'blank': True, 'editable': False})
+
+        retry_policy = RetryPolicy(max_attempts=5)
+        field = SequenceField(
+            key=['events'],
+            nowait=True,
+            block_size=10,
+            backend=StripedSequenceBackend(),
+            retry_policy=retry_policy,
+        )
+        field.set_attributes_from_name('number')
+        _, _, _, kwargs = field.deconstruct()
+        self.assertEqual(kwargs['nowait'], True)
+        self.assertEqual(kwargs['block_size'], 10)
+        self.assertEqual(kwargs['backend'], StripedSequenceBackend())
+        self.assertEqual(kwargs['retry_policy'], retry_policy)
+        self.assertNotIn('fill_gaps', kwargs)
+        self.assertNotIn('separator', kwargs)
+
+
+class SequenceBackendTestCase(TestCase):
+
+    def test_abstract_methods(self) -> None:
+        class IncompleteSequenceBackend(SequenceBackend):
+
+            def get_current_value(
+                self,
+                key: str,
+                default_value: int = 0,
+            ) -> int:
+                return default_value
+
+        with self.assertRaises(TypeError):
+            IncompleteSequenceBackend()  # type: ignore[abstract]
+
+
+class NativeSequenceBackendTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.backend = NativeSequenceBackend()
+        if not self.backend.is_supported(connection):
+            with self.assertRaises(NotSupportedError):
+                self.backend.get_next_value('items')
+            self.skipTest(f'Native sequences are not supported on {connection.vendor}.')
+
+    def test_get_next_value(self) -> None:
+        self.assertEqual(self.backend.get_current_value('items'), 0)
+        self.assertEqual(self.backend.get_next_value('items'), 1)
+        self.assertEqual(self.backend.get_next_value('items'), 2)
+        self.assertEqual(self.backend.get_next_value('Items'), 1)
+        self.assertEqual(self.backend.get_current_value('items'), 2)
+        self.assertEqual(self.backend.get_next_values('items', 3), [3, 4, 5])
+
+        with self.assertRaises(NotSupportedError):
+            self.backend.get_next_value('items', increment=2)
+
+    def test_set_current_value(self) -> None:
+        self.assertEqual(self.backend.set_current_value('items', 10), 10)
+        self.assertEqual(self.backend.get_current_value('items'), 10)
+        self.assertEqual(self.backend.get_next_value('items'), 11)
+        self.assertEqual(self.backend.set_current_value('items', 0), 0)
+        self.assertEqual(self.backend.get_next_value('items'), 1)
+
+    def test_get_sequence_name(self) -> None:
+        self.assertEqual(self.backend.get_sequence_name('items', connection), 'django_seq__items')
+        self.assertNotEqual(
+            self.backend.get_sequence_name('repositories.1.issues', connection),
+            self.backend.get_sequence_name('repositories_1_issues', connection),
+        )
+
+
+class StripedSequenceBackendTestCase(TestCase):
+
+    def test_get_next_value(self) -> None:
+        backend = StripedSequenceBackend(stripes=4)
+        values: List[int] = []
+
+        for stripe in [0, 1, 0, 3, 0]:
+            with mock.patch.object(backend, 'get_stripe', return_value=stripe):
+                values.append(backend.get_next_value('events'))
+
+        self.assertEqual(values, [1, 2, 5, 4, 9])
+        self.assertEqual(backend.get_current_value('events'), 9)
+        self.assertEqual(backend.get_current_value('audits'), 0)
+
+        with mock.patch.object(backend, 'get_stripe', return_value=1):
+            self.assertEqual(backend.get_next_values('events', 3), range(6, 15, 4))
+
+    def test_set_current_value(self) -> None:
+        backend = StripedSequenceBackend(stripes=4)
+
+        self.assertEqual(backend.set_current_value('events', 5), 5)
+        self.assertEqual(backend.get_current_value('events'), 5)
+
+        values = {
+            backend.get_next_value('events')
+            for _ in range(20)
+        }
+        self.assertEqual(len(values), 20)
+        self.assertGreater(min(values), 5)
+
+        self.assertEqual(StripedSequenceBackend(stripes=4), backend)
+        self.assertNotEqual(StripedSequenceBackend(stripes=2), backend)
+
+    def test_set_current_value_is_atomic(self) -> None:
+        backend = StripedSequenceBackend(stripes=4)
+        backend.set_current_value('events', 8)
+
+        set_current_value = Sequence.set_current_value
+        stripe_keys: List[str] = []
+
+        def _set_current_value(key: str, value: int, **kwargs: Any) -> int:
+            # The third stripe fails after the first two are set.
+            stripe_keys.append(key)
+            if len(stripe_keys) == 3:
+                raise DatabaseError
+            return set_current_value(key, value, **kwargs)
+
+        with mock.patch.object(Sequence, 'set_current_value', side_effect=_set_current_value):
+            with self.assertRaises(DatabaseError):
+                backend.set_current_value('events', 20)
+
+        self.assertEqual(
+            [Sequence.get_current_value(stripe_key) for stripe_key in backend.get_stripe_keys('events')],
+            [2, 2, 2, 2],
+        )
+
+
+class PooledSequenceBackendTestCase(TestCase):
+
+    def test_get_next_value(self) -> None:
+        backend = PooledSequenceBackend(size=5)
+
+        self.assertEqual(backend.refill('events'), 5)
+        self.assertEqual(backend.refill('events'), 0)
+        self.assertEqual(backend.get_pool_size('events'), 5)
+        self.assertEqual(backend.get_current_value('events'), 5)
+
+        self.assertEqual(backend.get_next_value('events'), 1)
+        self.assertEqual(backend.get_next_values('events', 3), [2, 3, 4])
+        self.assertEqual(backend.get_next_values('events', 3), [5, 6, 7])
+        self.assertEqual(backend.get_pool_size('events'), 0)
+
+        call_command('refill_sequence_pools', 'events', 'audits', size=2, stdout=StringIO())
+
+        self.assertEqual(backend.get_next_values('events', 2), [8, 9])
+        self.assertEqual(backend.get_next_values('audits', 2), [1, 2])
+
+    def test_set_current_value(self) -> None:
+        backend = PooledSequenceBackend(size=5)
+        backend.refill('events')
+        ReleasedValue.release('events', 20)
+        self.assertEqual(backend.get_pool_size('events'), 5)
+
+        # The values recycled from the deleted instances are kept.
+        self.assertEqual(backend.set_current_value('events', 10), 10)
+        self.assertEqual(backend.get_pool_size('events'), 0)
+        self.assertEqual(backend.get_next_values('events', 2), [20, 11])
+
+    def test_claim_without_row_locks(self) -> None:
+        for value in (1, 2, 3):
+            ReleasedValue.release('events', value)
+
+        with mock.patch.object(connection.features, 'has_select_for_update_skip_locked', False), \
+                mock.patch.object(connection.features, 'has_select_for_update', False):
+            self.assertEqual(ReleasedValue.claim_many('events', 2), [1, 2])
+
+        # A row deleted by a concurrent claimer in the meantime isn't claimed.
+        released_values = list(ReleasedValue.objects.values_list('pk', 'value'))
+        ReleasedValue.objects.filter(value=3).delete()
+        self.assertEqual(ReleasedValue.delete_claimed(released_values), [])
+
+
+class CacheSequenceBackendTestCase(TransactionTestCase):
+
+    databases = {'default', 'autonomous'}
+
+    def setUp(self) -> None:
+        self.backend = CacheSequenceBackend(checkpoint_interval=4, using='autonomous')
+        self.backend.get_cache().clear()
+        self.addCleanup(self.backend.get_cache().clear)
+
+    def test_get_next_value(self) -> None:
+        self.assertEqual(self.backend.get_next_value('events'), 1)
+        self.assertEqual(Sequence.get_current_value('events'), 0)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_next_value('events'), 2)
+            self.assertEqual(self.backend.get_next_value('events'), 3)
+            self.assertEqual(self.backend.get_current_value('events'), 3)
+
+        self.assertEqual(self.backend.get_next_value('events'), 4)
+        self.assertEqual(Sequence.get_current_value('events'), 4)
+
+        self.assertEqual(self.backend.get_next_values('events', 5), range(5, 10))
+        self.assertEqual(Sequence.get_current_value('events'), 9)
+
+    def test_get_next_value_after_cache_is_lost(self) -> None:
+        for value in range(1, 7):
+            self.assertEqual(self.backend.get_next_value('events'), value)
+        self.assertEqual(Sequence.get_current_value('events'), 4)
+
+        self.backend.get_cache().clear()
+
+        self.assertEqual(self.backend.get_current_value('events'), 4)
+        self.assertEqual(self.backend.get_next_value('events'), 13)
+
+    def test_get_next_value_after_rollback(self) -> None:
+        if connection.vendor == 'sqlite':
+            self.skipTest('SQLite allows a single writer, so the checkpoint would wait for the transaction.')
+
+        for value in range(1, 4):
+            self.assertEqual(self.backend.get_next_value('events'), value)
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.assertEqual(self.backend.get_next_value('events'), 4)
+            raise RuntimeError()
+
+        # The checkpoint outlives the transaction, like the counter does.
+        self.assertEqual(Sequence.get_current_value('events'), 4)
+
+        self.backend.get_cache().clear()
+        self.assertEqual(self.backend.get_next_value('events'), 13)
+
+    def test_get_database_alias(self) -> None:
+        with self.assertRaises(ImproperlyConfigured):
+            CacheSequenceBackend().get_next_value('events')
+
+    def test_set_current_value(self) -> None:
+        self.assertEqual(self.backend.set_current_value('events', 10), 10)
+        self.assertEqual(Sequence.get_current_value('events'), 10)
+        self.assertEqual(self.backend.get_next_value('events'), 11)
+
+        # Checkpoints never move the sequence backwards.
+        self.assertFalse(self.backend.checkpoint('events', 8))
+        self.assertEqual(Sequence.get_current_value('events'), 10)
+
+    def test_margin(self) -> None:
+        with self.assertRaises(ValueError):
+            CacheSequenceBackend(checkpoint_interval=4, margin=2)
+        self.assertEqual(CacheSequenceBackend(checkpoint_interval=4, margin=6).get_margin(), 6)
+
+
+class SharedMemorySequenceBackendTestCase(TransactionTestCase):
+
+    def setUp(self) -> None:
+        file_descriptor, self.path = tempfile.mkstemp()
+        os.close(file_descriptor)
+        self.addCleanup(os.remove, self.path)
+
+    def get_backend(self, ttl: float = 60.0, slots: int = 8) -> SharedMemorySequenceBackend:
+        # Every backend opens the file on its own, like the processes do.
+        return SharedMemorySequenceBackend(path=self.path, block_size=4, slots=slots, ttl=ttl)
+
+    def test_get_next_value(self) -> None:
+        backend = self.get_backend()
+        other_backend = self.get_backend()
+
+        self.assertEqual(backend.get_next_value('events'), 1)
+        self.assertEqual(Sequence.get_current_value('events'), 4)
+
+        # The block is checked against the database once per process.
+        with self.assertNumQueries(1):
+            self.assertEqual(other_backend.get_next_value('events'), 2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(other_backend.get_next_value('events'), 3)
+            self.assertEqual(backend.get_next_value('events'), 4)
+
+        self.assertEqual(other_backend.get_next_values('events', 6), range(5, 11))
+        self.assertEqual(Sequence.get_current_value('events'), 10)
+        self.assertEqual(backend.get_next_value('other_events'), 1)
+
+    def test_get_next_value_after_database_is_reset(self) -> None:
+        backend = self.get_backend()
+        other_backend = self.get_backend()
+
+        self.assertEqual(backend.get_next_value('events'), 1)
+        Sequence.objects.filter(key='events').delete()
+
+        # The values of the block are not reserved anymore.
+        self.assertEqual(other_backend.get_next_value('events'), 1)
+        self.assertEqual(Sequence.get_current_value('events'), 4)
+        self.assertEqual(Sequence.get_next_value('events'), 5)
+
+    def test_get_next_value_without_free_slots(self) -> None:
+        backend = self.get_backend(slots=2)
+
+        self.assertEqual(backend.get_next_value('events'), 1)
+        self.assertEqual(backend.get_next_value('audits'), 1)
+
+        # The keys which don't fit allocate only the values handed out.
+        for value in range(1, 4):
+            self.assertEqual(backend.get_next_value('logins'), value)
+            self.assertEqual(Sequence.get_current_value('logins'), value)
+
+        # Spent slots are taken over by the other keys.
+        self.assertEqual(backend.get_next_values('events', 3), range(2, 5))
+        self.assertEqual(backend.get_next_value('logins'), 4)
+        self.assertEqual(Sequence.get_current_value('logins'), 7)
+        with self.assertNumQueries(0):
+            self.assertEqual(backend.get_next_value('logins'), 5)
+
+        self.assertEqual(backend.get_next_value('events'), 5)
+        self.assertEqual(Sequence.get_current_value('events'), 5)
+
+    def test_get_next_value_ignores_planted_blocks(self) -> None:
+        backend = self.get_backend()
+        other_backend = self.get_backend()
+
+        self.assertEqual(backend.get_next_value('events'), 1)
+
+        # A block which outlives the blocks of the backend isn't taken.
+        digest = backend.get_digest('events')
+        with backend.open_table() as table:
+            offset = backend.find_slot(table, digest)
+            assert offset is not None
+            SLOT.pack_into(table, offset, digest, 1, 4, time.time() + 3600)
+
+        self.assertEqual(other_backend.get_next_value('events'), 5)
+        self.assertEqual(Sequence.get_current_value('events'), 8)
+
+    def test_get_directory(self) -> None:
+        directory = SharedMemorySequenceBackend().get_directory()
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+        self.assertTrue(SharedMemorySequenceBackend().get_path().startswith(directory))
+
+    def test_get_next_value_after_block_expires(self) -> None:
+        backend = self.get_backend(ttl=0)
+
+        self.assertEqual(backend.get_next_value('events'), 1)
+        self.assertEqual(backend.get_next_value('events'), 5)
+        self.assertEqual(Sequence.get_current_value('events'), 8)
+
+    def test_get_next_value_in_transaction(self) -> None:
+        backend = self.get_backend()
+        other_backend = self.get_backend()
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.assertEqual(backend.get_next_value('events'), 1)
+            raise RuntimeError()
+
+        with transaction.atomic():
+            self.assertEqual(backend.get_next_value('events'), 1)
+            # The block isn't shared until the transaction is committed.
+            with transaction.atomic():
+                self.assertEqual(other_backend.get_next_value('events'), 5)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(other_backend.get_next_value('events'), 2)
+
+    def test_set_current_value(self) -> None:
+        backend = self.get_backend()
+        other_backend = self.get_backend()
+
+        self.assertEqual(backend.get_next_value('events'), 1)
+        self.assertEqual(other_backend.set_current_value('events', 10), 10)
+        self.assertEqual(backend.get_next_value('events'), 11)
+
+
+class RetryPolicyTestCase(TestCase):
+
+    def get_lock_error(self) -> OperationalError:
+        # The error of the driver, as it's raised by every supported backend.
+        cause: Any = Exception(3572, 'could not obtain lock')
+        cause.sqlstate = cause.pgcode = '55P03'
+        cause.sqlite_errorcode = 5
+        error = OperationalError('could not obtain lock')
+        error.__cause__ = cause
+        return error
+
+    def test_execute(self) -> None:
+        calls: List[bool] = []
+
+        def _get_value(nowait: bool) -> int:
+            calls.append(nowait)
+            if nowait and len(calls) < 3:
+                raise self.get_lock_error()
+            return len(calls)
+
+        event = AllocationEvent(operation='get_next_value', key='repositories.1.issues')
+        retry_policy = RetryPolicy(max_attempts=3, base_delay=0)
+
+        self.assertEqual(retry_policy.execute(_get_value, 'default', event=event), 3)
+        self.assertEqual(calls, [True, True, True])
+        self.assertEqual(event.retries, 2)
+
+        calls.clear()
+
+        with self.assertRaises(OperationalError):
+            RetryPolicy(max_attempts=2, base_delay=0).execute(_get_value, 'default')
+
+        calls.clear()
+
+        self.assertEqual(RetryPolicy(max_attempts=2, base_delay=0, wait=True).execute(_get_value, 'default'), 3)
+        self.assertEqual(calls, [True, True, False])
+
+    def test_execute_raises_other_errors(self) -> None:
+        calls: List[bool] = []
+
+        def _get_value(nowait: bool) -> int:
+            calls.append(nowait)
+            raise OperationalError('server closed the connection unexpectedly')
+
+        with self.assertRaises(OperationalError):
+            RetryPolicy(max_attempts=3, base_delay=0, wait=True).execute(_get_value, 'default')
+        self.assertEqual(calls, [True])
+
+        self.assertTrue(RetryPolicy().is_lock_not_available(self.get_lock_error(), 'default'))
+
+    def test_get_delay(self) -> None:
+        retry_policy = RetryPolicy(base_delay=0.01, max_delay=0.05)
+        for attempt in range(1, 10):
+            self.assertLessEqual(retry_policy.get_delay(attempt), min(0.05, 0.01 * 2 ** (attempt - 1)))
+
+
 class SequenceTransactionTestCase(TransactionTestCase):
 
     def test_increase_value(self) -> None:
@@ -53,3 +833,149 @@ class SequenceTransactionTestCase(TransactionTestCase):
             Sequence.get_current_value('repositories.2.issues'),
             0,
         )
+
+    def test_get_next_value_with_retry_policy(self) -> None:
+        if not connection.features.has_select_for_update_nowait:
+            self.skipTest(f'NOWAIT is not supported on {connection.vendor}.')
+
+        with transaction.atomic():
+            Sequence.set_current_value('repositories.1.issues', 0)
+
+        locked = threading.Event()
+        release = threading.Event()
+
+        def _lock() -> None:
+            with ExitStack() as stack, transaction.atomic():
+                stack.callback(db.close_old_connections)
+                Sequence.get_next_value('repositories.1.issues')
+                locked.set()
+                release.wait(10)
+
+        def _get_next_value(retry_policy: RetryPolicy) -> int:
+            with ExitStack() as stack, transaction.atomic():
+                stack.callback(db.close_old_connections)
+                return Sequence.get_next_value(
+                    'repositories.1.issues',
+                    nowait=True,
+                    retry_policy=retry_policy,
+                )
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            lock_future = executor.submit(_lock)
+            locked.wait(10)
+
+            with self.assertRaises(DatabaseError):
+                executor.submit(_get_next_value, RetryPolicy(max_attempts=2, base_delay=0)).result()
+
+            future = executor.submit(_get_next_value, RetryPolicy(max_attempts=2, base_delay=0, wait=True))
+            release.set()
+            lock_future.result()
+
+            self.assertEqual(future.result(), 2)
+
+    def test_get_next_value_from_pool_skips_locked_values(self) -> None:
+        if not connection.features.has_select_for_update_skip_locked:
+            self.skipTest(f'SKIP LOCKED is not supported on {connection.vendor}.')
+
+        backend = PooledSequenceBackend(size=2)
+        backend.refill('events')
+
+        claimed = threading.Event()
+        release = threading.Event()
+
+        def _claim() -> int:
+            with ExitStack() as stack, transaction.atomic():
+                stack.callback(db.close_old_connections)
+                value = backend.get_next_value('events')
+                claimed.set()
+                release.wait(10)
+            return value
+
+        def _get_next_value() -> int:
+            with ExitStack() as stack, transaction.atomic():
+                stack.callback(db.close_old_connections)
+                return backend.get_next_value('events')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            claim_future = executor.submit(_claim)
+            claimed.wait(10)
+            self.assertEqual(executor.submit(_get_next_value).result(timeout=10), 2)
+            release.set()
+            self.assertEqual(claim_future.result(), 1)
+
+
+class AutonomousSequenceBackendTestCase(TransactionTestCase):
+
+    databases = {'default', 'autonomous'}
+
+    def test_get_next_value(self) -> None:
+        if not connection.features.has_select_for_update_nowait:
+            self.skipTest(f'NOWAIT is not supported on {connection.vendor}.')
+
+        backend = AutonomousSequenceBackend(using='autonomous')
+
+        def _get_next_value() -> int:
+            with ExitStack() as stack, transaction.atomic():
+                stack.callback(db.close_old_connections)
+                return Sequence.get_next_value('events', nowait=True)
+
+        with transaction.atomic():
+            self.assertEqual(backend.get_next_value('events'), 1)
+            # The value is committed already, so the sequence isn't locked
+            # until the end of this transaction.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                self.assertEqual(executor.submit(_get_next_value).result(timeout=10), 2)
+            transaction.set_rollback(True)
+
+        self.assertEqual(Sequence.get_current_value('events'), 2)
+
+        with self.assertRaises(RuntimeError), transaction.atomic(using='autonomous'):
+            backend.get_next_value('events')
+
+    def test_get_database_alias(self) -> None:
+        with self.assertRaises(ImproperlyConfigured):
+            AutonomousSequenceBackend().get_database_alias()
+
+        with override_settings(DJANGO_SEQ_AUTONOMOUS_DATABASE='autonomous'):
+            self.assertEqual(AutonomousSequenceBackend().get_database_alias(), 'autonomous')
+
+
+class SequenceDatabaseTestCase(TransactionTestCase):
+
+    databases = {'default', 'autonomous'}
+
+    def test_router(self) -> None:
+        router = SequenceRouter()
+
+        self.assertIsNone(router.db_for_write(Sequence))
+        self.assertIsNone(router.allow_migrate('default', 'django_seq', 'sequence'))
+
+        with override_settings(DJANGO_SEQ_DATABASE='autonomous'):
+            self.assertEqual(router.db_for_read(Sequence), 'autonomous')
+            self.assertEqual(router.db_for_write(ReleasedValue), 'autonomous')
+            self.assertIsNone(router.db_for_write(ContentType))
+            self.assertTrue(router.allow_migrate('autonomous', 'django_seq', 'sequence'))
+            self.assertFalse(router.allow_migrate('default', 'django_seq', 'releasedvalue'))
+            self.assertIsNone(router.allow_migrate('default', 'auth', 'user'))
+
+    def test_get_next_value(self) -> None:
+        with override_settings(DJANGO_SEQ_DATABASE='autonomous'):
+            self.assertEqual(Sequence.get_database_alias(), 'autonomous')
+            self.assertEqual(Sequence.get_database_alias('default'), 'default')
+            self.assertEqual(PooledSequenceBackend().get_database_alias(), 'autonomous')
+
+            with CaptureQueriesContext(connections['default']) as default_queries, \
+                    CaptureQueriesContext(connections['autonomous']) as queries:
+                # The sequence is locked in a transaction of its own, since
+                # there's none on the alias of the sequences.
+                self.assertEqual(Sequence.get_next_value('events', nowait=True), 1)
+                self.assertEqual(Sequence.set_current_value('events', 5), 5)
+                self.assertEqual(Sequence.get_current_value('events'), 5)
+                ReleasedValue.release('events', 3)
+                self.assertEqual(ReleasedValue.claim('events'), 3)
+
+            self.assertEqual(len(default_queries), 0)
+            self.assertGreater(len(queries), 0)
+
+            request = RequestFactory().get('/')
+            self.assertEqual(SequenceAdmin(Sequence, admin.site).get_queryset(request).db, 'autonomous')
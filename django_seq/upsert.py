@@ -0,0 +1,292 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
+
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Field
+
+from django_seq.conf import settings
+from django_seq.utils import get_model_options
+
+
+if TYPE_CHECKING:
+    from django_seq.models import AbstractSequence
+
+
+__all__ = (
+    'SequenceUpsert',
+)
+
+
+class SequenceUpsert:
+
+    @classmethod
+    def get_connection(
+        cls,
+        model: Type['AbstractSequence'],
+        using: Optional[str] = None,
+    ) -> BaseDatabaseWrapper:
+        return connections[model.get_database_alias(using)]
+
+    @classmethod
+    def get_field(
+        cls,
+        model: Type['AbstractSequence'],
+        field_name: str,
+    ) -> Field:
+        model_options = get_model_options(model)
+        return cast(Field, model_options.get_field(field_name))
+
+    @classmethod
+    def quote_column(
+        cls,
+        field: Field,
+        connection: BaseDatabaseWrapper,
+    ) -> str:
+        return connection.ops.quote_name(cast(str, field.column))
+
+    @classmethod
+    def is_supported(
+        cls,
+        model: Type['AbstractSequence'],
+        connection: BaseDatabaseWrapper,
+    ) -> bool:
+        if not cls.is_unique(model, model.get_lookup_field_names()):
+            return False
+        if connection.vendor == 'mysql':
+            return True
+        if connection.vendor in ('postgresql', 'sqlite'):
+            return bool(connection.features.can_return_columns_from_insert)
+        return False
+
+    @classmethod
+    def is_unique(
+        cls,
+        model: Type['AbstractSequence'],
+        field_names: List[str],
+    ) -> bool:
+        if len(field_names) == 1:
+            return bool(cls.get_field(model, field_names[0]).unique)
+        model_options = get_model_options(model)
+        return set(field_names) in [
+            *(set(constraint.fields) for constraint in model_options.total_unique_constraints),
+            *(set(fields) for fields in model_options.unique_together),
+        ]
+
+    @classmethod
+    def get_insert_values(
+        cls,
+        model: Type['AbstractSequence'],
+        key: str,
+        increment: int,
+        connection: BaseDatabaseWrapper,
+    ) -> List[Tuple[Field, Any]]:
+        model_options = get_model_options(model)
+        instance = model(
+            **{
+                model.KEY_FIELD_NAME: key,
+                model.VALUE_FIELD_NAME: increment,
+                **model.get_lookup(key),
+            },
+        )
+        values: List[Tuple[Field, Any]] = []
+        for field in model_options.concrete_fields:
+            if field is model_options.auto_field:
+                continue
+            value = field.pre_save(instance, True)
+            values.append(
+                (
+                    field,
+                    field.get_db_prep_save(value, connection=connection),
+                ),
+            )
+        return values
+
+    @classmethod
+    def get_touched_fields(
+        cls,
+        model: Type['AbstractSequence'],
+    ) -> List[Field]:
+        if not settings.UPDATE_TIMESTAMPS:
+            return []
+        model_options = get_model_options(model)
+        return [
+            field
+            for field in model_options.concrete_fields
+            if getattr(field, 'auto_now', False)
+        ]
+
+    @classmethod
+    def execute(
+        cls,
+        model: Type['AbstractSequence'],
+        key: str,
+        increment: int = 1,
+        using: Optional[str] = None,
+    ) -> Optional[int]:
+        connection = cls.get_connection(model, using)
+        if not cls.is_supported(model, connection):
+            return None
+        if connection.vendor == 'mysql':
+            return cls.execute_mysql(model, key, increment, connection)
+        return cls.execute_on_conflict(model, key, increment, connection)
+
+    @classmethod
+    def execute_on_conflict(
+        cls,
+        model: Type['AbstractSequence'],
+        key: str,
+        increment: int,
+        connection: BaseDatabaseWrapper,
+    ) -> int:
+        model_options = get_model_options(model)
+        table = connection.ops.quote_name(model_options.db_table)
+        lookup_columns = [
+            cls.quote_column(cls.get_field(model, field_name), connection)
+            for field_name in model.get_lookup_field_names()
+        ]
+        value_column = cls.quote_column(cls.get_field(model, model.VALUE_FIELD_NAME), connection)
+        insert_values = cls.get_insert_values(model, key, increment, connection)
+        columns = [
+            cls.quote_column(field, connection)
+            for field, _ in insert_values
+        ]
+        assignments = [
+            f'{value_column} = {table}.{value_column} + EXCLUDED.{value_column}',
+            *(
+                f'{column} = EXCLUDED.{column}'
+                for column in (
+                    cls.quote_column(field, connection)
+                    for field in cls.get_touched_fields(model)
+                )
+            ),
+        ]
+        sql = (
+            f'INSERT INTO {table} ({", ".join(columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))}) '
+            f'ON CONFLICT ({", ".join(lookup_columns)}) DO UPDATE SET {", ".join(assignments)} '
+            f'RETURNING {value_column}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [value for _, value in insert_values])
+            row = cursor.fetchone()
+        return int(row[0])
+
+    @classmethod
+    def execute_many(
+        cls,
+        model: Type['AbstractSequence'],
+        increments: Dict[str, int],
+        current_values: Optional[Dict[str, int]] = None,
+        using: Optional[str] = None,
+    ) -> Optional[Dict[str, int]]:
+        # MySQL returns the value of a single row only by `LAST_INSERT_ID()`.
+        connection = cls.get_connection(model, using)
+        if not cls.is_supported(model, connection) or connection.vendor == 'mysql':
+            return None
+        model_options = get_model_options(model)
+        table = connection.ops.quote_name(model_options.db_table)
+        lookup_columns = [
+            cls.quote_column(cls.get_field(model, field_name), connection)
+            for field_name in model.get_lookup_field_names()
+        ]
+        key_column = cls.quote_column(cls.get_field(model, model.KEY_FIELD_NAME), connection)
+        value_column = cls.quote_column(cls.get_field(model, model.VALUE_FIELD_NAME), connection)
+        current_values = current_values or {}
+        # Rows are locked in the order of the keys, to prevent deadlocks
+        # between the statements sharing some of the keys.
+        rows = [
+            cls.get_insert_values(model, key, {**increments, **current_values}[key], connection)
+            for key in sorted({*increments, *current_values})
+        ]
+        columns = [
+            cls.quote_column(field, connection)
+            for field, _ in rows[0]
+        ]
+        value_assignment = f'{table}.{value_column} + EXCLUDED.{value_column}'
+        if current_values:
+            # The sequences of `current_values` are set to the given values.
+            value_assignment = (
+                f'CASE WHEN {table}.{key_column} IN ({", ".join(["%s"] * len(current_values))}) '
+                f'THEN EXCLUDED.{value_column} ELSE {value_assignment} END'
+            )
+        assignments = [
+            f'{value_column} = {value_assignment}',
+            *(
+                f'{column} = EXCLUDED.{column}'
+                for column in (
+                    cls.quote_column(field, connection)
+                    for field in cls.get_touched_fields(model)
+                )
+            ),
+        ]
+        placeholders = f'({", ".join(["%s"] * len(columns))})'
+        sql = (
+            f'INSERT INTO {table} ({", ".join(columns)}) '
+            f'VALUES {", ".join([placeholders] * len(rows))} '
+            f'ON CONFLICT ({", ".join(lookup_columns)}) DO UPDATE SET {", ".join(assignments)} '
+            f'RETURNING {key_column}, {value_column}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql,
+                [
+                    *(value for row in rows for _, value in row),
+                    *sorted(current_values),
+                ],
+            )
+            results = cursor.fetchall()
+        return {
+            key: int(value)
+            for key, value in results
+        }
+
+    @classmethod
+    def execute_mysql(
+        cls,
+        model: Type['AbstractSequence'],
+        key: str,
+        increment: int,
+        connection: BaseDatabaseWrapper,
+    ) -> int:
+        model_options = get_model_options(model)
+        table = connection.ops.quote_name(model_options.db_table)
+        value_column = cls.quote_column(cls.get_field(model, model.VALUE_FIELD_NAME), connection)
+        insert_values = cls.get_insert_values(model, key, increment, connection)
+        columns = [
+            cls.quote_column(field, connection)
+            for field, _ in insert_values
+        ]
+        assignments = [
+            f'{value_column} = LAST_INSERT_ID({value_column} + %s)',
+            *(
+                f'{column} = VALUES({column})'
+                for column in (
+                    cls.quote_column(field, connection)
+                    for field in cls.get_touched_fields(model)
+                )
+            ),
+        ]
+        sql = (
+            f'INSERT INTO {table} ({", ".join(columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))}) '
+            f'ON DUPLICATE KEY UPDATE {", ".join(assignments)}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*(value for _, value in insert_values), increment])
+            # A row count of 1 means a new row has been inserted, with the
+            # increment as its value. Otherwise, the updated value has been
+            # stored by `LAST_INSERT_ID(expr)` for this connection.
+            if cursor.rowcount == 1:
+                return increment
+            cursor.execute('SELECT LAST_INSERT_ID()')
+            row = cursor.fetchone()
+        return int(row[0])
@@ -1,6 +1,10 @@
+import functools
+import hashlib
+import uuid
 from typing import (
     TYPE_CHECKING,
     Type,
+    Union,
     cast,
 )
 
@@ -17,6 +21,7 @@ if TYPE_CHECKING:
 __all__ = (
     'get_sequence_model',
     'get_model_options',
+    'hash_key',
 )
 
 
@@ -44,6 +49,7 @@ def _get_swappable_model(
     return model
 
 
+@functools.lru_cache(maxsize=None)
 def get_sequence_model() -> Type['AbstractSequence']:
     from django_seq.conf import settings
     return cast(
@@ -59,3 +65,13 @@ def get_model_options(
     model: Type[Model],
 ) -> Options:
     return model._meta  # noqa
+
+
+def hash_key(
+    key: str,
+    size: int = 8,
+) -> Union[int, uuid.UUID]:
+    digest = hashlib.blake2b(key.encode(), digest_size=size).digest()
+    if size == 16:
+        return uuid.UUID(bytes=digest)
+    return int.from_bytes(digest, 'big', signed=True)
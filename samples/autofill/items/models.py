@@ -16,3 +16,27 @@ class Item(models.Model):
         resolve_integrity_errors=True,
         unique=True,
     )
+
+    recyclable_number = SequenceField(  # type: ignore
+        key=['recyclable_items'],
+        recycle_values=True,
+        unique=True,
+    )
+
+
+class Ticket(models.Model):
+
+    number = SequenceField(  # type: ignore
+        key=['tickets'],
+        unique=True,
+    )
+
+    audit_number = SequenceField(  # type: ignore
+        key=['ticket_events'],
+        unique=True,
+    )
+
+    closing_audit_number = SequenceField(  # type: ignore
+        key=['ticket_events'],
+        unique=True,
+    )
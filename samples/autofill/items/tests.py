@@ -1,7 +1,18 @@
+from django.db import (
+    DatabaseError,
+    connection,
+    transaction,
+)
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django_seq.gaps import GapFinder
+from django_seq.models import ReleasedValue
 from django_seq.utils import get_sequence_model
 
-from items.models import Item
+from items.models import (
+    Item,
+    Ticket,
+)
 
 
 Sequence = get_sequence_model()
@@ -55,3 +66,94 @@ class ItemTestCase(TestCase):
         item_4 = Item.objects.create()
         self.assertEqual(item_4.unique_number, 4)
         self.assertEqual(Sequence.get_current_value('unique_items'), 4)
+
+    def test_sequence_field_recycles_values(self) -> None:
+        items = [Item.objects.create() for _ in range(4)]
+        self.assertEqual([item.recyclable_number for item in items], [1, 2, 3, 4])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            items[2].delete()
+            Item.objects.filter(pk=items[1].pk).delete()
+        self.assertEqual(ReleasedValue.objects.filter(key='recyclable_items').count(), 2)
+
+        item_5 = Item.objects.create()
+        self.assertEqual(item_5.recyclable_number, 2)
+
+        item_6 = Item.objects.create()
+        self.assertEqual(item_6.recyclable_number, 3)
+
+        item_7 = Item.objects.create()
+        self.assertEqual(item_7.recyclable_number, 5)
+        self.assertEqual(Sequence.get_current_value('recyclable_items'), 5)
+        self.assertFalse(ReleasedValue.objects.filter(key='recyclable_items').exists())
+
+    def test_sequence_field_keeps_values_of_rolled_back_deletions(self) -> None:
+        item = Item.objects.create()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    item.delete()
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+        self.assertFalse(ReleasedValue.objects.filter(key='recyclable_items').exists())
+
+        self.assertEqual(Item.objects.create().recyclable_number, 2)
+
+    def test_sequence_fields_are_written_together(self) -> None:
+        Item.objects.create()
+
+        with CaptureQueriesContext(connection) as context:
+            item = Item.objects.create()
+        self.assertEqual(
+            (item.reusable_number, item.unique_number, item.recyclable_number),
+            (2, 2, 2),
+        )
+
+        # The target values are read first, then all sequences are written by
+        # a single statement.
+        sequence_writes = [
+            query['sql']
+            for query in context.captured_queries
+            if Sequence._meta.db_table in query['sql'] and not query['sql'].startswith('SELECT')
+        ]
+        self.assertEqual(len(sequence_writes), 1)
+
+    def test_gap_finder(self) -> None:
+        self.assertIsNone(GapFinder.find(Item.objects.all(), 'reusable_number'))
+
+        for number in (1, 2, 3, 5, 6, 9):
+            Item.objects.create(reusable_number=number, unique_number=number)
+
+        for find in (GapFinder.find_with_window, GapFinder.find_with_subquery):
+            self.assertEqual(find(Item.objects.all(), 'reusable_number'), 3)
+            self.assertEqual(find(Item.objects.filter(reusable_number__gt=3), 'reusable_number'), 6)
+            self.assertEqual(find(Item.objects.filter(reusable_number__gt=6), 'reusable_number'), 9)
+            self.assertIsNone(find(Item.objects.filter(reusable_number__gt=9), 'reusable_number'))
+
+
+class TicketTestCase(TestCase):
+
+    def test_sequence_fields_are_allocated_together(self) -> None:
+        # The values of all fields are allocated by a single statement, then
+        # the ticket is inserted.
+        with self.assertNumQueries(2):
+            ticket_1 = Ticket.objects.create()
+        self.assertEqual(ticket_1.number, 1)
+        self.assertEqual(ticket_1.audit_number, 1)
+        self.assertEqual(ticket_1.closing_audit_number, 2)
+
+        ticket_2 = Ticket.objects.create()
+        self.assertEqual(ticket_2.number, 2)
+        self.assertEqual(ticket_2.audit_number, 3)
+        self.assertEqual(ticket_2.closing_audit_number, 4)
+        self.assertEqual(Sequence.get_current_value('tickets'), 2)
+        self.assertEqual(Sequence.get_current_value('ticket_events'), 4)
+
+    def test_explicit_values_are_kept(self) -> None:
+        ticket = Ticket.objects.create(number=10)
+        self.assertEqual(ticket.number, 10)
+        self.assertEqual(ticket.audit_number, 1)
+        self.assertEqual(ticket.closing_audit_number, 2)
+        self.assertEqual(Sequence.get_current_value('tickets'), 0)
@@ -1,6 +1,9 @@
 from django.db import models
 
-from django_seq.models import SequenceField
+from django_seq.models import (
+    SequenceField,
+    SequenceManager,
+)
 
 
 class Repository(models.Model):
@@ -20,8 +23,31 @@ class Issue(models.Model):
         key=['repositories', models.F('repository'), 'issues'],
     )
 
+    objects = SequenceManager()
+
     class Meta:
 
         unique_together = (
             ('repository', 'index'),
         )
+
+
+class Milestone(models.Model):
+
+    repository = models.ForeignKey(  # type: ignore
+        to=Repository,
+        on_delete=models.CASCADE,
+        blank=False,
+        null=False,
+    )
+
+    number = SequenceField(  # type: ignore
+        key=['repositories', models.F('repository'), 'milestones'],
+        fill_gaps=True,
+    )
+
+    class Meta:
+
+        unique_together = (
+            ('repository', 'number'),
+        )
@@ -1,6 +1,15 @@
+from typing import (
+    Any,
+    List,
+)
+
 from django.test import TestCase
+from django_seq.instrumentation import AllocationEvent
+from django_seq.segmentation import CompiledFPath
+from django_seq.signals import allocation_measured
 from issues.models import (
     Issue,
+    Milestone,
     Repository,
 )
 
@@ -22,3 +31,97 @@ class IssueTestCase(TestCase):
                     repository=repositories[repository_idx],
                 )
                 self.assertEqual(issue.index, issue_idx + 1)
+
+    async def test_sequence_field_with_asave(self) -> None:
+        repository = await Repository.objects.acreate()
+
+        for issue_idx in range(3):
+            issue = Issue(repository=repository)
+            await issue.asave()
+            self.assertEqual(issue.index, issue_idx + 1)
+
+        issue = await Issue.objects.acreate(repository=repository)
+        self.assertEqual(issue.index, 4)
+
+    def test_sequence_field_emits_allocation_events(self) -> None:
+        repository = Repository.objects.create()
+
+        events: List[AllocationEvent] = []
+
+        def _receive(event: AllocationEvent, **kwargs: Any) -> None:
+            events.append(event)
+
+        allocation_measured.connect(_receive, sender=Issue)
+        self.addCleanup(allocation_measured.disconnect, _receive, sender=Issue)
+
+        Issue.objects.create(repository=repository)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].operation, 'pre_save')
+        self.assertEqual(events[0].key, f'repositories.{repository.pk}.issues')
+        self.assertEqual(events[0].mode, 'plain')
+        self.assertGreaterEqual(events[0].round_trips, 1)
+        self.assertGreater(events[0].key_evaluation_duration, 0)
+
+    def test_sequence_field_with_bulk_create(self) -> None:
+        repository_1 = Repository.objects.create()
+        repository_2 = Repository.objects.create()
+
+        Issue.objects.create(repository=repository_1)
+
+        # The values of both keys are reserved by a single statement.
+        with self.assertNumQueries(2):
+            issues = Issue.objects.bulk_create(
+                [
+                    Issue(repository=repository_1),
+                    Issue(repository=repository_2),
+                    Issue(repository=repository_1),
+                    Issue(repository=repository_2),
+                    Issue(repository=repository_1),
+                ],
+            )
+
+        self.assertEqual(
+            [issue.index for issue in issues],
+            [2, 1, 3, 2, 4],
+        )
+
+        issue = Issue.objects.create(repository=repository_2)
+        self.assertEqual(issue.index, 3)
+
+    def test_sequence_field_fills_gaps_in_partition(self) -> None:
+        repository_1 = Repository.objects.create()
+        repository_2 = Repository.objects.create()
+
+        milestones = [
+            Milestone.objects.create(repository=repository_1)
+            for _ in range(3)
+        ]
+        self.assertEqual([milestone.number for milestone in milestones], [1, 2, 3])
+
+        milestone = Milestone.objects.create(repository=repository_2)
+        self.assertEqual(milestone.number, 1)
+
+        milestones[1].delete()
+
+        milestone = Milestone.objects.create(repository=repository_2)
+        self.assertEqual(milestone.number, 2)
+
+        milestone = Milestone.objects.create(repository=repository_1)
+        self.assertEqual(milestone.number, 2)
+
+        milestone = Milestone.objects.create(repository=repository_1)
+        self.assertEqual(milestone.number, 4)
+
+    def test_sequence_field_does_not_fetch_related_objects(self) -> None:
+        repository = Repository.objects.create()
+        Issue.objects.create(repository=repository)
+
+        issue = Issue(repository_id=repository.pk)
+        with self.assertNumQueries(2):
+            issue.save()
+        self.assertEqual(issue.index, 2)
+
+        for f_name in ('repository', 'repository__pk', 'repository__id'):
+            f_path = CompiledFPath(f_name, model=Issue)
+            self.assertEqual(f_path.steps, [('repository_id', None)])
@@ -1,4 +1,12 @@
-from django_seq.models import BaseSequence
+from django.db import models
+
+from django_seq.models import (
+    BaseHashedSequence,
+    BaseSequence,
+    BaseStructuredSequence,
+    BaseUUIDHashedSequence,
+    SequenceField,
+)
 
 
 class Sequence(BaseSequence):
@@ -8,3 +16,38 @@ class Sequence(BaseSequence):
     ):
 
         db_table = 'sequences'
+
+
+class HashedSequence(BaseHashedSequence):
+
+    class Meta(
+        BaseHashedSequence.Meta,
+    ):
+
+        db_table = 'hashed_sequences'
+
+
+class UUIDHashedSequence(BaseUUIDHashedSequence):
+
+    class Meta(
+        BaseUUIDHashedSequence.Meta,
+    ):
+
+        db_table = 'uuid_hashed_sequences'
+
+
+class StructuredSequence(BaseStructuredSequence):
+
+    class Meta(
+        BaseStructuredSequence.Meta,
+    ):
+
+        db_table = 'structured_sequences'
+
+
+class Issue(models.Model):
+
+    number = SequenceField(  # type: ignore
+        key=['repositories', 42, 'issues'],
+        separator='/',
+    )
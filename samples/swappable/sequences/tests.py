@@ -1,10 +1,177 @@
-from django.test import TestCase
-from sequences.models import Sequence
+from django.db import (
+    connection,
+    models,
+    transaction,
+)
+from django.db.migrations.executor import MigrationExecutor
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from sequences.models import (
+    HashedSequence,
+    Issue,
+    Sequence,
+    StructuredSequence,
+    UUIDHashedSequence,
+)
 
 from django_seq import get_sequence_model
+from django_seq.models import SequenceField
+from django_seq.operations import (
+    AlterSwappableField,
+    CopySequences,
+)
+from django_seq.utils import (
+    get_model_options,
+    hash_key,
+)
 
 
 class SequenceTestCase(TestCase):
 
     def test_get_sequence_model(self) -> None:
         self.assertIs(get_sequence_model(), Sequence)
+
+    def test_hashed_sequence(self) -> None:
+        for model in [HashedSequence, UUIDHashedSequence]:
+            with transaction.atomic():
+                self.assertEqual(model.get_next_value('repositories.1.issues'), 1)
+                self.assertEqual(model.get_next_value('repositories.1.issues'), 2)
+                self.assertEqual(model.get_next_value('repositories.2.issues', nowait=True), 1)
+                self.assertEqual(model.get_next_value('repositories.2.issues', nowait=True), 2)
+                self.assertEqual(model.set_current_value('repositories.3.issues', 5), 5)
+                self.assertEqual(model.get_next_values('repositories.3.issues', 2), range(6, 8))
+
+            self.assertEqual(model.get_current_value('repositories.1.issues'), 2)
+            self.assertEqual(model.get_current_value('repositories.4.issues'), 0)
+
+            sequence = model.objects.get(key='repositories.3.issues')
+            self.assertEqual(sequence.key_hash, hash_key('repositories.3.issues', model.KEY_HASH_SIZE))
+
+    def test_structured_sequence(self) -> None:
+        with transaction.atomic():
+            self.assertEqual(StructuredSequence.get_next_value('repositories.42.issues'), 1)
+            self.assertEqual(StructuredSequence.get_next_value('repositories.42.issues', nowait=True), 2)
+            self.assertEqual(StructuredSequence.get_next_value('repositories.42.pulls'), 1)
+            self.assertEqual(StructuredSequence.get_next_value('repositories.7.issues'), 1)
+            self.assertEqual(StructuredSequence.get_next_value('invoices'), 1)
+            self.assertEqual(StructuredSequence.set_current_value('repositories.007.issues', 5), 5)
+
+        self.assertEqual(StructuredSequence.get_current_value('repositories.42.issues'), 2)
+        self.assertEqual(StructuredSequence.get_current_value('repositories.007.issues'), 5)
+
+        self.assertEqual(
+            StructuredSequence.get_lookup('repositories.42.issues.open'),
+            {'namespace': 'repositories', 'scope_id': 42, 'name': 'issues.open'},
+        )
+        self.assertEqual(
+            StructuredSequence.get_lookup('repositories.007.issues'),
+            {'namespace': 'repositories', 'scope_id': StructuredSequence.NO_SCOPE_ID, 'name': '007.issues'},
+        )
+        self.assertEqual(
+            StructuredSequence.get_lookup('invoices'),
+            {'namespace': 'invoices', 'scope_id': StructuredSequence.NO_SCOPE_ID, 'name': ''},
+        )
+
+        self.assertEqual(
+            sorted(StructuredSequence.get_scope_queryset('repositories', 42).values_list('key', flat=True)),
+            ['repositories.42.issues', 'repositories.42.pulls'],
+        )
+        self.assertEqual(StructuredSequence.get_scope_queryset('repositories').count(), 4)
+
+    def test_structured_sequence_rejects_ambiguous_keys(self) -> None:
+        for key in ['invoices.', 'repositories.42.', 'x' * 256, 'repositories.42.' + 'x' * 256]:
+            with self.assertRaises(ValueError):
+                StructuredSequence.get_lookup(key)
+
+    def test_structured_sequence_with_field_separator(self) -> None:
+        field: SequenceField[int, int] = SequenceField(key=['repositories', 42, 'issues'], separator='/')
+        self.assertEqual(field.get_compiled_key(Sequence).static_value, 'repositories/42/issues')
+
+        with override_settings(DJANGO_SEQ_SEQUENCE_MODEL='sequences.StructuredSequence'):
+            field = SequenceField(key=['repositories', 42, 'issues'], separator='/')
+            key = field.get_compiled_key(Sequence).static_value
+            self.assertEqual(key, 'repositories.42.issues')
+            self.assertEqual(
+                StructuredSequence.get_lookup(key),
+                {'namespace': 'repositories', 'scope_id': 42, 'name': 'issues'},
+            )
+
+    def test_structured_sequence_after_swap(self) -> None:
+        field = get_model_options(Issue).get_field('number')
+        assert isinstance(field, SequenceField)
+        self.assertEqual(field.get_compiled_key(Issue).static_value, 'repositories/42/issues')
+
+        # The keys compiled for the previous sequence model are compiled again.
+        with override_settings(DJANGO_SEQ_SEQUENCE_MODEL='sequences.StructuredSequence'):
+            self.assertEqual(field.get_compiled_key(Issue).static_value, 'repositories.42.issues')
+            self.assertEqual(Issue.objects.create().number, 1)
+            self.assertEqual(StructuredSequence.get_current_value('repositories.42.issues'), 1)
+
+        self.assertEqual(field.get_compiled_key(Issue).static_value, 'repositories/42/issues')
+
+    def test_copy_sequences_with_field_separator(self) -> None:
+        Sequence.set_current_value('repositories/42/issues', 10)
+
+        executor = MigrationExecutor(connection)
+        state = executor.loader.project_state()
+
+        operation = CopySequences(
+            from_model='sequences.Sequence',
+            to_model='sequences.StructuredSequence',
+            separator='/',
+        )
+        operation.code(state.apps, connection.schema_editor())
+
+        self.assertEqual(StructuredSequence.get_current_value('repositories.42.issues'), 10)
+        self.assertEqual(StructuredSequence.objects.get().key, 'repositories.42.issues')
+
+        # Keys whose segments contain the separator of the model are refused.
+        StructuredSequence.objects.all().delete()
+        Sequence.set_current_value('repositories/42/issues.open', 20)
+        with self.assertRaises(ValueError):
+            operation.code(state.apps, connection.schema_editor())
+
+    def test_copy_sequences(self) -> None:
+        with transaction.atomic():
+            Sequence.set_current_value('repositories.1.issues', 10)
+            Sequence.set_current_value('repositories.2.issues', 20)
+
+        created_at = Sequence.objects.get(key='repositories.1.issues').created_at
+
+        executor = MigrationExecutor(connection)
+        state = executor.loader.project_state()
+
+        for model in [HashedSequence, UUIDHashedSequence, StructuredSequence]:
+            operation = CopySequences(
+                from_model='sequences.Sequence',
+                to_model=f'sequences.{model.__name__}',
+                batch_size=1,
+            )
+            operation.code(state.apps, connection.schema_editor())
+
+            self.assertEqual(model.get_current_value('repositories.1.issues'), 10)
+            self.assertEqual(model.get_current_value('repositories.2.issues'), 20)
+            self.assertEqual(model.objects.get(key='repositories.1.issues').created_at, created_at)
+
+            with transaction.atomic():
+                self.assertEqual(model.get_next_value('repositories.1.issues'), 11)
+
+    def test_alter_swappable_field(self) -> None:
+        executor = MigrationExecutor(connection)
+        state = executor.loader.project_state()
+
+        # The default sequence model is replaced by the swapped one.
+        operation = AlterSwappableField(
+            model_name='sequence',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='updated at'),
+        )
+        self.assertFalse(operation.is_applicable('django_seq', state))
+
+        to_state = state.clone()
+        operation.state_forwards('django_seq', to_state)
+        operation.database_forwards('django_seq', connection.schema_editor(), state, to_state)
+        self.assertNotIn(('django_seq', 'sequence'), to_state.models)
+        self.assertIn(('sequences', 'sequence'), to_state.models)